@@ -0,0 +1,31 @@
+from timeit import default_timer as timer
+
+from logic_variables import Var
+from sequence_options.sequences import append, PyList
+
+"""
+Benchmark for sequences.append on PyLists of n elements, in its three modes:
+  append(Xs, Ys, Zs) with Xs and Zs known:  a single split;
+  append(Xs, Ys, Zs) with only Zs known:    all n+1 splits;
+  append(Xs, Xs, Zs) with Zs a Var:         concatenation.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/appends.py
+"""
+
+
+def time_append(label: str, make_args, expected: int, repetitions: int):
+  start = timer( )
+  for _ in range(repetitions):
+    assert sum(1 for _ in append(*make_args( ))) == expected
+  end = timer( )
+  print(f'\t{label}: {round((end - start) / repetitions * 1e3, 3)} msec')
+
+
+if __name__ == '__main__':
+  for n in [10, 100, 1_000]:
+    (Xs, Zs) = (PyList(list(range(n // 2))), PyList(list(range(n))))
+    repetitions = max(1, 2_000 // n)
+    print(f'Zs of {n} elements')
+    time_append('Xs and Zs known', lambda: (Xs, Var( ), Zs), 1, repetitions)
+    time_append('Zs known', lambda: (Var( ), Var( ), Zs), n + 1, repetitions)
+    time_append('Xs and Ys known', lambda: (Xs, Xs, Var( )), 1, repetitions)
@@ -0,0 +1,46 @@
+import sys
+from timeit import default_timer as timer
+
+from control_structures import forall
+from logic_variables import n_Vars, PyValue, unify
+from sequence_options.sequences import PyList
+from sequence_options.super_sequence import is_a_subsequence_of
+
+"""
+Benchmark for forall/forany, as used by is_a_subsequence_of, and for forall on its own.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/conjunctions.py
+"""
+
+
+def time_is_a_subsequence_of(n: int, repetitions: int = 5):
+  Zs = PyList(list(range(n)))
+  # Every 40th element. Also try it with the middle element replaced by a Var.
+  for As in [list(map(PyValue, range(0, n, 40))),
+             [*map(PyValue, range(0, n // 2, 40)), *n_Vars(1), *map(PyValue, range(n // 2 + 40, n, 40))]]:
+    start = timer( )
+    for _ in range(repetitions):
+      solutions = sum(1 for _ in is_a_subsequence_of(As, Zs))
+    end = timer( )
+    print(f'is_a_subsequence_of({len(As)} elements, {n} elements): {solutions} solution(s), '
+          f'{round((end - start) / repetitions * 1e3, 2)} msec')
+
+
+def time_forall(n: int, repetitions: int = 100):
+  Vs = n_Vars(n)
+  lambdas = [lambda V=V, i=i: unify(V, i) for (i, V) in enumerate(Vs)]
+  goal_tuples = [(unify, (V, i)) for (i, V) in enumerate(Vs)]
+  for (label, gens) in [('lambdas', lambdas), ('(predicate, args) tuples', goal_tuples)]:
+    start = timer( )
+    for _ in range(repetitions):
+      for _ in forall(gens):
+        pass
+    end = timer( )
+    print(f'forall over {n} unify goals as {label}: {round((end - start) / repetitions * 1e3, 3)} msec')
+
+
+if __name__ == '__main__':
+  # A safety margin for the earlier, recursive versions of these functions.
+  sys.setrecursionlimit(20_000)
+  time_is_a_subsequence_of(200)
+  time_forall(200)
@@ -0,0 +1,31 @@
+from timeit import default_timer as timer
+
+from logic_variables import n_Vars
+from sequence_options.linked_list import LinkedList
+from sequence_options.sequences import PyList
+from sequence_options.super_sequence import is_contiguous_in, next_to
+
+"""
+Benchmark for is_contiguous_in and next_to on closed LinkedLists (and PyLists, for comparison).
+
+Each query enumerates every segment of the list that unifies with [X, Y] where Y is one given element.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/contiguous_sublist.py
+"""
+
+
+def run(ListType, n: int, repetitions: int):
+  Zs = ListType(list(range(n)))
+  start = timer( )
+  for _ in range(repetitions):
+    (X, Y) = n_Vars(2)
+    assert sum(1 for _ in is_contiguous_in([X, n // 2], Zs)) == 1
+    assert sum(1 for _ in next_to(Y, n // 2, Zs)) == 2
+  end = timer( )
+  print(f'{ListType.__name__} of {n}: {round((end - start) / repetitions * 1e3, 3)} ms per is_contiguous_in + next_to')
+
+
+if __name__ == '__main__':
+  for n in [10, 100, 1_000]:
+    for ListType in [LinkedList, PyList]:
+      run(ListType, n, max(1, 1_000 // n))
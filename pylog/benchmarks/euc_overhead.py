@@ -0,0 +1,62 @@
+from functools import wraps
+from timeit import default_timer as timer
+
+from logic_variables import euc, Var
+from sequence_options.linked_list import LinkedList
+from sequence_options.super_sequence import member
+
+"""
+Benchmark for the @euc decorator.
+
+1. member(X, L) over all the elements of a 1000-element LinkedList.
+2. The per-call overhead of @euc on a trivial generator, compared with the earlier version of the
+   decorator, which wrapped every generator in a second generator.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/euc_overhead.py
+"""
+
+
+def double_wrapping_euc(f):
+  """ The earlier version of @euc (for generator functions) for comparison. """
+
+  def var_unification_chain_end(v):
+    return v.unification_chain_end() if isinstance(v, Var) else v
+
+  @wraps(f)
+  def euc_wrapper_gen(*args, **kwargs):
+    args_unification_chain_ends = (var_unification_chain_end(arg) for arg in args)
+    kwargs_unification_chain_ends = {k: var_unification_chain_end(v) for (k, v) in kwargs.items()}
+    yield from f(*args_unification_chain_ends, **kwargs_unification_chain_ends)
+
+  return euc_wrapper_gen
+
+
+def succeed(X, Y):
+  yield
+
+
+def time_member(n: int, repetitions: int = 20):
+  L = LinkedList(list(range(n)))
+  X = Var( )
+  start = timer( )
+  for _ in range(repetitions):
+    for _ in member(X, L):
+      pass
+  end = timer( )
+  print(f'member(X, L) over a {n}-element LinkedList: {round((end - start) / repetitions * 1e3, 2)} msec')
+
+
+def time_decorator(label: str, decorated, repetitions: int = 200_000):
+  (X, Y) = (Var( ), Var( ))
+  start = timer( )
+  for _ in range(repetitions):
+    for _ in decorated(X, Y):
+      pass
+  end = timer( )
+  print(f'{label}: {round((end - start) / repetitions * 1e6, 3)} usec per call')
+
+
+if __name__ == '__main__':
+  time_member(1_000)
+  time_decorator('@euc', euc(succeed))
+  time_decorator('double-wrapping @euc', double_wrapping_euc(succeed))
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+from random import seed
+from timeit import default_timer as timer
+from typing import Optional
+
+from examples.transversals.transversals_FD import gen_sets, Model
+
+"""
+Benchmark for transversals_FD.FD_solver on random gen_sets(20) instances.
+
+For each instance and each propagate/smallest_first/matching setting, find the first 1000 solutions (or all
+of them if there are fewer) and report the time and the number of FD_solver calls (model.nodes), i.e., search
+nodes. The instances are generated from fixed seeds, so runs are comparable. (The setting with neither
+propagate nor smallest_first is left out: on some of these instances it takes millions of nodes.)
+
+With matching, the All_Different matching filter (Régin's algorithm) runs at every node. It leaves only values
+that are part of some solution, so the search never backtracks out of a dead end. Compare its node counts with
+those of propagate alone. The default gen_sets(20) sets are large (up to 20 values), and nearly every partial
+assignment extends to a solution. The gen_sets(20, 4) sets have at most 4 values. Most of those instances have
+no solution at all (seeds 0 - 2), which the matching filter finds before the search starts (0 nodes).
+
+Each run builds its own Model, so nothing has to be reset between runs. The same runs are then repeated in a
+process pool, and their node counts must agree with the sequential ones.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/fd_solver.py
+"""
+
+# (nbr_sets, sets_size_high, the seeds of the instances)
+families = [(20, None, range(3)), (20, 4, range(5))]
+
+settings = [(False, True, False), (True, False, False), (True, True, False), (True, False, True), (True, True, True)]
+
+
+def instance_sets(nbr_sets: int, sets_size_high: Optional[int], instance: int):
+  seed(instance)
+  return gen_sets(nbr_sets, sets_size_high)
+
+
+def run(sets, propagate: bool, smallest_first: bool, matching: bool, max_solutions: int = 1000):
+  model = Model.from_sets(sets, propagate, smallest_first, matching)
+  solutions = 0
+  start = timer( )
+  for _ in model.solutions( ):
+    solutions += 1
+    if solutions == max_solutions:
+      break
+  end = timer( )
+  return (solutions, model.nodes, end - start)
+
+
+def run_instance(nbr_sets: int, sets_size_high: Optional[int], instance: int,
+                 propagate: bool, smallest_first: bool, matching: bool):
+  return run(instance_sets(nbr_sets, sets_size_high, instance), propagate, smallest_first, matching)
+
+
+if __name__ == '__main__':
+  runs = [(nbr_sets, sets_size_high, instance, *setting)
+          for (nbr_sets, sets_size_high, instances) in families for instance in instances for setting in settings]
+  results = {}
+  start = timer( )
+  for run_args in runs:
+    (nbr_sets, sets_size_high, instance, propagate, smallest_first, matching) = run_args
+    if (propagate, smallest_first, matching) == settings[0]:
+      print(f'gen_sets({nbr_sets}{"" if sets_size_high is None else f", {sets_size_high}"}), seed {instance}')
+    results[run_args] = (solutions, nodes, time) = run_instance(*run_args)
+    print(f'\tpropagate: {propagate}; smallest_first: {smallest_first}; matching: {matching}; '
+          f'solutions: {solutions}; nodes: {nodes}; {round(time, 3)} sec')
+  end = timer( )
+  print(f'sequential: {round(end - start, 3)} sec')
+
+  start = timer( )
+  with ProcessPoolExecutor( ) as pool:
+    pooled = dict(zip(runs, pool.map(run_instance, *zip(*runs))))
+  end = timer( )
+  assert all(pooled[key][:2] == results[key][:2] for key in runs)
+  print(f'process pool: {round(end - start, 3)} sec (same solutions and node counts)')
@@ -0,0 +1,56 @@
+from timeit import default_timer as timer
+
+from logic_variables import bind, StructureItem, Trail
+from sequence_options.sequences import IndexedPyList, PyList
+from sequence_options.super_sequence import member
+
+"""
+Benchmark for member(Item(...), Items) on puzzle-sized lists of StructureItems: PyList vs. IndexedPyList.
+
+Each Item has 12 attributes. The first is a ground id. Of the others, those of all but the last 5 Items are
+bound (by unification, as a puzzle's clues would bind them); those of the last 5 Items are still Vars.
+Each query binds one attribute and enumerates every solution. Finally, a backtracking check confirms that
+the IndexedPyList's index is restored along with the bindings.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/indexed_member.py
+"""
+
+nbr_attributes = 12
+
+
+class Item(StructureItem):
+
+  __slots__ = ( )
+
+  def __init__(self, *args, **kwargs):
+    attributes = [kwargs.get(f'a{p}') for p in range(nbr_attributes)]
+    for (p, arg) in enumerate(args):
+      attributes[p] = arg
+    super( ).__init__( attributes )
+
+
+def run(ListType, n: int, repetitions: int) -> int:
+  Items = ListType([Item(i) for i in range(n)])
+  # Bind the attributes of all but the last 5 Items, e.g., a3 of Item i to (i*3) % n.
+  mark = Trail.mark( )
+  for i in range(n - 5):
+    assert bind(Items[i], Item(i, *[(i * p) % n for p in range(1, nbr_attributes)]))
+  solutions = 0
+  start = timer( )
+  for _ in range(repetitions):
+    for p in range(1, nbr_attributes):
+      for _ in member(Item(**{f'a{p}': (7 * p) % n}), Items):
+        solutions += 1
+  end = timer( )
+  Trail.undo_to(mark)
+  # After backtracking, every Item matches again.
+  assert sum(1 for _ in member(Item(a5=0), Items)) == n
+  print(f'{ListType.__name__} of {n} Items: {round((end - start) / repetitions / (nbr_attributes - 1) * 1e6, 1)} '
+        f'usec per query')
+  return solutions
+
+
+if __name__ == '__main__':
+  for n in [50, 200, 1_000]:
+    repetitions = max(1, 10_000 // n)
+    assert run(PyList, n, repetitions) == run(IndexedPyList, n, repetitions)
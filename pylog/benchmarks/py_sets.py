@@ -0,0 +1,36 @@
+from timeit import default_timer as timer
+
+from logic_variables import PyValue
+from sequence_options.sequences import PySet
+from sequence_options.super_sequence import member
+
+"""
+Benchmark for PySet.discard and for member(E, A_PySet) with E a ground value.
+
+Each repetition discards 10 values, one after another, from a PySet of n ints, as
+transversals.tnvsl_dfs_gen_lv does along a branch of its search, and looks up the last element.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/py_sets.py
+"""
+
+
+def run(n: int, repetitions: int):
+  S = PySet(list(range(n)))
+  start = timer( )
+  for _ in range(repetitions):
+    T = S
+    for value in range(0, n, max(1, n // 10)):
+      T = T.discard(PyValue(value))
+    assert len(T) == n - 10
+  discarded = timer( )
+  for _ in range(repetitions):
+    assert sum(1 for _ in member(n - 1, S)) == 1
+  looked_up = timer( )
+  print(f'PySet of {n}:\n'
+        f'\tdiscard: {round((discarded - start) / repetitions / 10 * 1e6, 2)} usec\n'
+        f'\tmember: {round((looked_up - discarded) / repetitions * 1e6, 2)} usec')
+
+
+if __name__ == '__main__':
+  for n in [10, 100, 1_000, 10_000]:
+    run(n, max(1, 20_000 // n))
@@ -0,0 +1,51 @@
+from timeit import default_timer as timer
+
+from logic_variables import n_Vars, Structure, StructureItem, unify
+from sequence_options.sequences import PyList
+
+"""
+Benchmark for unifying wide Structures, long PyLists, and deeply nested Structures.
+
+Each case unifies a template full of Vars with a ground term, succeeds once, and backtracks.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/structure_unification.py
+"""
+
+
+class House(StructureItem):
+
+  __slots__ = ( )
+
+  def __init__(self, nationality=None, smoke=None, pet=None, drink=None, color=None):
+    super( ).__init__( (nationality, smoke, pet, drink, color) )
+
+
+def nested(depth: int, leaf):
+  """ f(f(f(...f(leaf)...))) """
+  term = leaf
+  for _ in range(depth):
+    term = Structure( ('f', term) )
+  return term
+
+
+def time_unify(label: str, make_pair, repetitions: int):
+  pairs = [make_pair( ) for _ in range(repetitions)]
+  start = timer( )
+  for (Left, Right) in pairs:
+    for _ in unify(Left, Right):
+      pass
+  end = timer( )
+  print(f'{label}: {round((end - start) / repetitions * 1e6, 2)} usec per unify')
+
+
+if __name__ == '__main__':
+  time_unify('House(...) x House(...)',
+             lambda: (House( ), House('English', 'Kool', 'dog', 'tea', 'red')),
+             100_000)
+  for n in [10, 100, 1_000, 10_000]:
+    time_unify(f'PyList of {n} Vars x PyList of {n} ints',
+               lambda: (PyList(n_Vars(n)), PyList(list(range(n)))),
+               max(1, 100_000 // n))
+  time_unify('f(f(...f(_)...)) x f(f(...f(1)...)), depth 10,000',
+             lambda: (nested(10_000, n_Vars(1)[0]), nested(10_000, 1)),
+             10)
@@ -0,0 +1,45 @@
+import sys
+from timeit import default_timer as timer
+
+from logic_variables import n_Vars, PyValue
+from sequence_options.sequences import PyList
+from sequence_options.super_sequence import is_a_subsequence, is_a_subsequence_of, is_a_subsequence_of_open
+
+"""
+Benchmark for is_a_subsequence_of (dynamic programming, index tuples) against the original recursive
+version (still used for open LinkedLists as is_a_subsequence_of_open), and for the yes/no is_a_subsequence.
+
+Zs is range(n) with its elements 0 and n/2 repeated once. As is a sample of Zs:
+  ground:       every 20th element (4 embeddings, because of the repeats);
+  one Var:      the same, with its middle element replaced by a Var;
+  missing:      the ground sample with a value that is not in Zs appended (no embedding).
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/subsequences.py
+"""
+
+
+def time_it(label: str, f, repetitions: int):
+  start = timer( )
+  for _ in range(repetitions):
+    result = f( )
+  end = timer( )
+  print(f'\t{label}: {result}, {round((end - start) / repetitions * 1e3, 2)} msec')
+
+
+def run(n: int, repetitions: int):
+  Zs = PyList([z for i in range(n) for z in ([i, i] if i % (n // 2) == 0 else [i])])
+  ground = list(map(PyValue, range(0, n, 20)))
+  one_Var = ground[:len(ground) // 2] + n_Vars(1) + ground[len(ground) // 2 + 1:]
+  missing = ground + [PyValue(-1)]
+  print(f'Zs of {len(Zs)} elements, As of {len(ground)} elements')
+  for (label, As) in [('ground', ground), ('one Var', one_Var), ('missing', missing)]:
+    time_it(f'{label}, original', lambda: sum(1 for _ in is_a_subsequence_of_open(As, Zs)), repetitions)
+    time_it(f'{label}, dynamic programming', lambda: sum(1 for _ in is_a_subsequence_of(As, Zs)), repetitions)
+    time_it(f'{label}, is_a_subsequence', lambda: is_a_subsequence(As, Zs), repetitions)
+
+
+if __name__ == '__main__':
+  # The original version recurses once per element of Zs.
+  sys.setrecursionlimit(20_000)
+  run(100, 20)
+  run(1_000, 1)
@@ -0,0 +1,57 @@
+import tracemalloc
+
+from logic_variables import PyValue, StructureItem, Var
+
+"""
+Memory benchmark: bytes per Var, per PyValue, and per 5-arg StructureItem (including its args).
+
+The Term hierarchy declares __slots__. For comparison, each measurement is repeated for a subclass that
+does not declare __slots__ and so carries a per-instance __dict__ -- as every Term did before.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/term_memory.py
+"""
+
+
+class House(StructureItem):
+
+  __slots__ = ( )
+
+  def __init__(self, nationality=None, smoke=None, pet=None, drink=None, color=None):
+    super( ).__init__( (nationality, smoke, pet, drink, color) )
+
+
+class Unslotted_House(StructureItem):
+
+  def __init__(self, nationality=None, smoke=None, pet=None, drink=None, color=None):
+    super( ).__init__( (nationality, smoke, pet, drink, color) )
+
+
+class Unslotted_PyValue(PyValue):
+  pass
+
+
+class Unslotted_Var(Var):
+  pass
+
+
+def bytes_per_object(make, n: int = 100_000) -> float:
+  tracemalloc.start( )
+  before = tracemalloc.get_traced_memory( )[0]
+  objects = [make( ) for _ in range(n)]
+  after = tracemalloc.get_traced_memory( )[0]
+  tracemalloc.stop( )
+  # Don't charge the objects for the list that holds them.
+  list_size = objects.__sizeof__( )
+  return (after - before - list_size) / n
+
+
+if __name__ == '__main__':
+  cases = [('Var', Var, Unslotted_Var),
+           ('PyValue', lambda: PyValue('abc'), lambda: Unslotted_PyValue('abc')),
+           ('5-arg StructureItem', lambda: House('English', 'Kool', 'dog', 'tea', 'red'),
+                                   lambda: Unslotted_House('English', 'Kool', 'dog', 'tea', 'red')),
+           ]
+  for (label, slotted, unslotted) in cases:
+    print(f'{label}:\n'
+          f'\t{round(bytes_per_object(slotted), 1)} bytes per object\n'
+          f'\t{round(bytes_per_object(unslotted), 1)} bytes per object with a per-instance __dict__')
@@ -0,0 +1,57 @@
+from timeit import default_timer as timer
+
+from logic_variables import bind, n_Vars, Trail
+
+"""
+Microbenchmark for Var.unification_chain_end( ) on long Var-to-Var chains.
+
+Builds a chain V[0] -> V[1] -> ... -> V[n-1] and then dereferences the Vars on it.
+The first dereference of V[0] walks the whole chain and compresses it. Later
+dereferences (of V[0] or of any other Var on the chain) take a single hop.
+Backtracking (Trail.undo_to) restores the original chain, which is checked at the end.
+
+Run from the pylog directory, e.g., PYTHONPATH=. python benchmarks/unification_chains.py
+"""
+
+
+def build_chain(n: int):
+  Vs = n_Vars(n)
+  for (V, W) in zip(Vs, Vs[1:]):
+    bind(V, W)
+  return Vs
+
+
+def run(n: int, repetitions: int = 1000):
+  mark = Trail.mark( )
+  start = timer( )
+  Vs = build_chain(n)
+  built = timer( )
+
+  End = Vs[0].unification_chain_end( )
+  first = timer( )
+
+  for _ in range(repetitions):
+    Vs[0].unification_chain_end( )
+  repeated = timer( )
+
+  for V in Vs:
+    assert V.unification_chain_end( ) is End
+  all_Vs = timer( )
+
+  Trail.undo_to(mark)
+  undone = timer( )
+  assert all(V.unification_chain_next is None for V in Vs)
+
+  print(f'chain of {n} Vars:\n'
+        f'\tbuild: {round(built - start, 4)} sec\n'
+        f'\tfirst dereference of V[0]: {round((first - built) * 1e6, 1)} usec\n'
+        f'\trepeated dereference of V[0]: {round((repeated - first) / repetitions * 1e6, 3)} usec\n'
+        f'\tdereference of every Var on the chain: {round((all_Vs - repeated) / n * 1e6, 3)} usec per Var\n'
+        f'\tundo: {round(undone - all_Vs, 4)} sec')
+
+
+if __name__ == '__main__':
+  for n in [100, 1_000, 10_000]:
+    run(n)
+  # The chain is not limited by the recursion limit.
+  run(100_000)
@@ -1,6 +1,7 @@
 # from inspect import getmembers
+from functools import wraps
 from inspect import isgeneratorfunction, signature
-from typing import Generator
+from typing import Callable, Generator, Iterator, Tuple, Union
 
 from logic_variables import PyValue, Var, euc, unify, unify_pairs
 
@@ -107,6 +108,68 @@ def bool_yield_wrapper(gen):
   return wrapped_func
 
 
+class Trampoline:
+  """
+  A flat execution driver for generator predicates.
+
+  Ordinarily, a predicate that recurses, e.g., member, delegates to its recursive call with "yield from".
+  Each level adds a frame to the chain of yield-froms, and resuming the innermost generator passes through
+  all of them. So resuming costs O(depth), and a few thousand levels raise RecursionError.
+
+  A predicate decorated with @trampolined instead yields the sub-goal it would have delegated to:
+
+      yield member(E, Tail)       # rather than: yield from member(E, Tail)
+
+  The Trampoline keeps the active generators on an explicit stack. When the generator on top of the stack
+  yields None (or any value other than a sub-goal), that's a success, which is passed on to whoever is iterating
+  the Trampoline. When it yields a sub-goal, i.e., any iterator (a generator, another Trampoline, iter([]), ...),
+  the sub-goal is pushed. When it is exhausted, it is popped and the generator below it resumes. So resuming
+  costs O(1), and the depth is limited only by memory.
+
+  A Trampoline is an ordinary iterator. Existing code iterates it like any other generator: for _ in member(...).
+  Existing (undecorated) generators run unchanged, whether they are run inside a Trampoline or run a
+  Trampoline themselves. They simply don't get the flat execution.
+  """
+  def __init__(self, gen):
+    self.__name__ = gen.__name__
+    self.stack = [gen]
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    stack = self.stack
+    while stack:
+      try:
+        sub_goal = next(stack[-1])
+      except StopIteration:
+        stack.pop( )
+        continue
+      if isinstance(sub_goal, Trampoline):
+        # Take over its (not yet started) stack rather than running it as a nested iterator.
+        stack.extend(sub_goal.stack)
+        sub_goal.stack = []
+      elif hasattr(sub_goal, '__next__'):
+        stack.append(sub_goal)
+      else:
+        # A success. Pass along whatever was yielded, typically None.
+        return sub_goal
+    raise StopIteration
+
+
+def trampolined(gen):
+  """
+  A decorator for generator predicates that yield their recursive (or other delegated) sub-goals rather than
+  "yield from" them. Calling the decorated function returns a Trampoline. See Trampoline.
+  Should be applied under @euc, i.e., @euc comes first.
+  """
+  @wraps(gen)
+  def trampolined_wrapper(*args, **kwargs):
+    return Trampoline(gen(*args, **kwargs))
+
+  return trampolined_wrapper
+
+
 def bool_to_sf(b: bool) -> Generator[None, None, None]:
   """ 
   Turns a boolean condition into a Generator, which succeeds/fails
@@ -130,34 +193,62 @@ def fails(f):
   return fails_wrapper
 
 
+@trampolined
 def forall(gens):
   """
   Succeeds if all generators in the gens list succeed. The elements in the gens list
-  are embedded in lambda functions to avoid premature evaluation.
+  are embedded in lambda functions to avoid premature evaluation. They may instead be
+  (predicate, args) tuples, which avoids building a closure for each one. (See run_goal.)
+
+  Walks an index over gens rather than recursing on gens[1:]. runs[i] is the running iterator for
+  gens[i]. When it succeeds, move on to gens[i+1]; when it is exhausted, back up to gens[i-1].
+  The last generator is handed to the Trampoline, since its successes are simply forall's successes.
   """
-  if not gens:
+  last = len(gens) - 1
+  if last < 0:
     # They have all succeeded.
     yield
-  else:
-    # Get gens[0] and evaluate the lambda expression to get a fresh iterator.
-    # If it succeeds, run the rest of the generators in the list.
-    for _ in gens[0]( ):
-      yield from forall(gens[1:])
+    return
+  runs = [None] * last
+  index = 0
+  if last > 0:
+    runs[0] = run_goal(gens[0])
+  while index >= 0:
+    if index == last:
+      yield run_goal(gens[last])
+      index -= 1
+    elif next(runs[index], exhausted) is exhausted:
+      index -= 1
+    else:
+      index += 1
+      if index < last:
+        runs[index] = run_goal(gens[index])
 
 
+@trampolined
 def forany(gens):
   """
   Succeeds if any of the generators in the gens list succeed. On "back-up," tries them all.
+  As in forall, the elements of gens may be lambda functions or (predicate, args) tuples.
   """
   for gen in gens:
     # Get the gens; evaluate them to extract them from lambda; and run them.
     # Succeed if any of them succeed.
-    # Can probably not do the lambda trick here, but keeping it makes it
-    # parallel to forall. Succeed if any of them succeed.
-    # Try them all even if earlier ones succeed. 
-    # for _ in gen( ):
-    #   yield
-    yield from gen( )
+    # Try them all even if earlier ones succeed. (See Trampoline.)
+    yield run_goal(gen)
+
+
+def run_goal(goal: Union[Callable[[], Iterator], Tuple[Callable[..., Iterator], Tuple]]) -> Iterator:
+  """
+  Start a goal, i.e., return a fresh iterator for it. A goal is either a function of no arguments,
+  typically a lambda, or a (predicate, args) tuple, which is run as predicate(*args). Either may return
+  any iterable, e.g., a list, which succeeds once for each of its elements.
+  """
+  return iter(goal[0](*goal[1]) if isinstance(goal, tuple) else goal( ))
+
+
+# Returned by next(iterator, exhausted) when iterator has no more successes.
+exhausted = object( )
 
 
 class Trace:
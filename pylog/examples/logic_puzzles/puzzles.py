@@ -6,11 +6,17 @@ from logic_variables import Term
 
 
 def all_distinct(lst: List[Term]):
-  # The following builds a set, not a list: no duplicates.
-  values = { x.get_py_value() if x.is_instantiated() else str(x) for x in lst }
-  if len(values) == len(lst):
-    # Succeed if the number of distinct values is the same as the length of the list.
-    yield
+  # Ground Terms are hashable, so they go directly into a set: no duplicates.
+  # Terms that are not ground are distinct unless they have the same unification_chain_end.
+  (ground, not_ground) = (set( ), set( ))
+  for x in lst:
+    x_euc = x.unification_chain_end( )
+    (values, value) = (ground, x_euc) if x_euc.is_instantiated( ) else (not_ground, id(x_euc))
+    if value in values:
+      # Fail as soon as we find a duplicate.
+      return
+    values.add(value)
+  yield
 
 
 def all_all_distinct(lists: List[List[Term]]):
@@ -43,6 +43,8 @@ Students:
 
 class Stdnt(StructureItem):
 
+  __slots__ = ( )
+
   def __init__(self, name=None, major=None, scholarship=None, first_arg_as_str_functor=True):
     # Package the properties together and create a StructureItem for this Student.
     super( ).__init__( (name, major, scholarship), first_arg_as_str_functor)
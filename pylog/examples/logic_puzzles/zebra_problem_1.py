@@ -47,6 +47,9 @@ Houses:
 
 
 class House(StructureItem):
+
+  __slots__ = ( )
+
   def __init__(self, nationality=None, smoke=None, pet=None, drink=None, color=None, first_arg_as_str_functor=True):
     # Package the properties together and create a StructureItem for this Student.
     super( ).__init__( (nationality, smoke, pet, drink, color), first_arg_as_str_functor)
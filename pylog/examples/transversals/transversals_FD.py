@@ -1,59 +1,193 @@
 from __future__ import annotations
 
 from random import randint, sample
-from typing import List, Set, Union
+from typing import Dict, Iterator, List, Set, Union
 
 from control_structures import Trace
-from logic_variables import euc
+from logic_variables import FD_Universe, Undo_Trail
 
 
-class All_Different:
-
-    # sibs_dict = {FD_Var_x: {FD_Var_i that must be different from FD_Var_x}}
-    # Aggregated from the All_Different declarations
-    sibs_dict = {}
+class Model:
+    """
+    A transversal problem: its Model_Vars, its All_Different constraints, the search heuristics, and statistics.
+
+    Everything that used to be a class-level global (the sibs_dict aggregated from the All_Different
+    declarations, the var id counter, and the propagate and smallest_first heuristics) belongs to a Model.
+    So do the trail on which its Model_Vars record their domain changes (a logic_variables.Undo_Trail of its
+    own, rather than the global binding Trail) and the state of its trace (see FD_solver). Independent Models
+    share no state: they need no resets between runs, and their searches may be interleaved or run in
+    separate workers.
+    """
 
-    def __init__(self, vars: Set[FD_Var]):
-        self.vars = vars
-        for v in vars:
-            All_Different.sibs_dict[v] = All_Different.sibs_dict.setdefault(v, set()) | (vars - {v})
+    def __init__(self, universe: FD_Universe, propagate=False, smallest_first=False, matching=False,
+                 trace=False):
+        self.universe = universe
+        self.propagate = propagate
+        self.smallest_first = smallest_first
+        # Whether to run the All_Different matching filters (see All_Different.filter) at every node.
+        self.matching = matching
+
+        self.vars: Set[Model_Var] = set()
+        self.constraints: List[All_Different] = []
+        # sibs_dict = {Model_Var_x: {Model_Var_i that must be different from Model_Var_x}}
+        # Aggregated from the All_Different declarations
+        self.sibs_dict = {}
+
+        self.trail = Undo_Trail()
+        self.last_id = 0
+        # The number of FD_solver calls, i.e., search nodes.
+        self.nodes = 0
+        # Whether FD_solver prints a line for each node, and the current depth of the search.
+        self.trace = trace
+        self.depth = 0
 
-    @staticmethod
-    def all_satisfied():
-        return all(All_Different.satisfied_for_var(v) for v in All_Different.sibs_dict)
+    def __str__(self):
+        return Trace.to_str(self.vars)
 
     @staticmethod
-    def satisfied_for_var(v: FD_Var):
+    def from_sets(sets, propagate=False, smallest_first=False, matching=False, trace=False) -> Model:
+        """ The transversal problem for sets: a Model_Var for each set, all different. """
+        model = Model(FD_Universe(flatten_sets_to_set(sets)), propagate, smallest_first, matching, trace)
+        All_Different(model, {Model_Var(model, set) for set in sets})
+        return model
+
+    def all_satisfied(self):
+        return all(self.satisfied_for_var(v) for v in self.sibs_dict)
+
+    def filter(self) -> bool:
+        """
+        Run the All_Different filters until none of them narrows a domain. Return False if one of them fails.
+        (One pass is enough when there is a single All_Different: its filter leaves nothing more to remove.)
+        """
+        while True:
+            mark = self.trail.mark()
+            if not all(constraint.filter() for constraint in self.constraints):
+                return False
+            if self.trail.mark() == mark or len(self.constraints) == 1:
+                return True
+
+    def new_id(self):
+        self.last_id += 1
+        return self.last_id
+
+    def satisfied_for_var(self, v: Model_Var):
         if not v.is_instantiated(): return True
-        return all(v.value() != w.value() for w in All_Different.sibs_dict[v])
+        # Two instantiated Model_Vars have the same value if and only if they have the same (single bit) domain.
+        return all(v.domain != w.domain for w in self.sibs_dict[v])
 
-    @staticmethod
-    def to_string_sibs_dict():
-        return '{' + ", ".join([All_Different.to_string_sibs_entry(v) for v in All_Different.sibs_dict]) + '}'
+    def solutions(self):
+        """ Yield once for each solution, i.e., each assignment of distinct values to self.vars. """
+        mark = self.trail.mark()
+        if not self.matching or self.filter():
+            yield from FD_solver(self)
+        self.trail.undo_to(mark)
 
-    @staticmethod
-    def to_string_sibs_entry(v):
-        entry = f'{v.name}: ' + '{' + ", ".join(v.name for v in All_Different.sibs_dict[v]) + '}'
+    def to_string_sibs_dict(self):
+        return '{' + ", ".join([self.to_string_sibs_entry(v) for v in self.sibs_dict]) + '}'
+
+    def to_string_sibs_entry(self, v):
+        entry = f'{v.name}: ' + '{' + ", ".join(v.name for v in self.sibs_dict[v]) + '}'
         return entry
 
 
-class FD_Var:
-    """ A Finite Domain variable """
-    id = 0
+class All_Different:
+    """
+    The Model_Vars in vars must have distinct values.
+
+    When its model is set to do matching, an All_Different is also a global propagator (Régin's algorithm).
+    It keeps a maximum matching between its vars and their values: self.matched = {var: value bit}. filter()
+    extends that matching to cover every var, or fails if it can't (e.g., three vars with only two values
+    among them). It then removes from each domain every value that belongs to no maximum matching.
+
+    The matching is not put on the trail. Backtracking only widens domains, so the old matching is still valid.
+    It is the starting point for the next filter(), which rematches only the vars that lost their values.
+    """
 
-    propagate = False
-    smallest_first = False
+    def __init__(self, model: Model, vars: Set[Model_Var]):
+        self.vars = vars
+        self.matched: Dict[Model_Var, int] = {}
+        model.constraints.append(self)
+        for v in vars:
+            model.sibs_dict[v] = model.sibs_dict.setdefault(v, set()) | (vars - {v})
+
+    def augment(self, v: Model_Var, owner: Dict[int, Model_Var], visited: Set[int]) -> bool:
+        """ Look for an augmenting path from the unmatched v. If there is one, flip the matching along it. """
+        for bit in bits_in(v.domain):
+            if bit not in visited:
+                visited.add(bit)
+                w = owner.get(bit)
+                if w is None or self.augment(w, owner, visited):
+                    self.matched[v] = bit
+                    owner[bit] = v
+                    return True
+        return False
+
+    def filter(self) -> bool:
+        """ Make every value in every domain part of some maximum matching. Return False if there is none. """
+        matched = self.matched
+        for v in [v for v in matched if not v.domain & matched[v]]:
+            del matched[v]
+        owner = {bit: v for (v, bit) in matched.items()}
+        for v in self.vars:
+            if v not in matched and not self.augment(v, owner, set()):
+                return False
+
+        # The graph: vars are nodes 0 .. n-1, the value at bit position k is node n + k.
+        # Each var points to its matched value. Each value points to the other vars that have it in their domains.
+        # A value that is not matched to v may be given to v in some maximum matching if and only if
+        # o it is reachable from a free (unmatched) value, or
+        # o it is in the same strongly connected component as v.
+        vars = list(self.vars)
+        n = len(vars)
+        succs: List[List[int]] = [[] for _ in range(n + len(vars[0].universe.values) if vars else 0)]
+        for (i, v) in enumerate(vars):
+            succs[i].append(n + matched[v].bit_length() - 1)
+            for bit in bits_in(v.domain & ~matched[v]):
+                succs[n + bit.bit_length() - 1].append(i)
+
+        reached = [False] * len(succs)
+        stack = [node for node in range(n, len(succs)) if succs[node] and (1 << node - n) not in owner]
+        for node in stack:
+            reached[node] = True
+        while stack:
+            for nxt in succs[stack.pop()]:
+                if not reached[nxt]:
+                    reached[nxt] = True
+                    stack.append(nxt)
+
+        component = strongly_connected_components(succs)
+        for (i, v) in enumerate(vars):
+            new_domain = matched[v]
+            for bit in bits_in(v.domain & ~new_domain):
+                node = n + bit.bit_length() - 1
+                if reached[node] or component[node] == component[i]:
+                    new_domain |= bit
+            v.update_domain(new_domain)
+        return True
+
+
+class Model_Var:
+    """
+    A Finite Domain variable of a Model. Its domain is narrowed by the search and by propagation rather than by
+    unification, so it is not a logic_variables.FD_Var. (It would also pay for Var.__getattr__, which slows
+    every attribute lookup.) self.domain is an int bitmask over the model's universe, which maps values to bits.
+    (See logic_variables.FD_Universe.)
+
+    Changes to domain and was_set are recorded on the model's trail, and only if they really are changes.
+    set_value takes a trail mark before it sets the value and propagates it. Backtracking to that mark
+    restores every domain it touched in a single loop.
+    """
 
-    def __init__(self, init_range=None, name=None):
-        FD_Var.id += 1
-        self.id = FD_Var.id
+    def __init__(self, model: Model, init_domain=None, name=None):
+        self.model = model
+        self.id = model.new_id()
         self.name = name if name is not None else f'V{str(self.id)}'
-        self.range = set() if init_range is None else init_range
-        self.range_was_set_stack = []
+        self.universe = model.universe
+        model.vars.add(self)
+        self.domain = 0 if init_domain is None else self.universe.mask(init_domain)
         self.was_set = False
-        self.unification_chain_next = None
 
-    def __eq__(self, other: FD_Var):
+    def __eq__(self, other: Model_Var):
         return self.id == other.id
 
     def __hash__(self):
@@ -62,65 +196,130 @@ class FD_Var:
     def __str__(self):
         name_part = '' if self.name is None else self.name + ('*' if self.was_set else '') + ': '
         (left, right) = ("{", "}")
-        return f'{name_part}{left}{", ".join([str(x) for x in self.range])}{right}'
+        return f'{name_part}{left}{", ".join([str(x) for x in self.domain_values()])}{right}'
 
     def is_instantiated(self):
-        return len(self.range) == 1
+        return self.domain != 0 and self.domain & (self.domain - 1) == 0
 
-    def member_FD(self, a_list: List[Union[FD_Var, int, str]]):
+    def member_FD(self, a_list: List[Union[Model_Var, int, str]]):
         """ Is v in a_list?  """
-        # If a_list is empty, it can't have a member. So fail.
-        if not a_list: return
+        for value in a_list:
+            yield from self.set_value(value)
 
-        yield from self.set_value(a_list[0])
-        yield from self.member_FD(a_list[1:])
+    def domain_values(self):
+        return self.universe.values_in(self.domain)
 
     def propagate_value(self, value):
-        for v in All_Different.sibs_dict[self]:
-            v.update_range(v.range - {value})
+        bit = self.universe.bits[value]
+        for v in self.model.sibs_dict[self]:
+            if v.domain & bit:
+                v.update_domain(v.domain & ~bit)
 
     def set_value(self, new_value: Union[float, int, str]):
-        self.update_range({new_value}, True)
-        if FD_Var.propagate:
+        model = self.model
+        mark = model.trail.mark()
+        self.update_domain(self.universe.bits[new_value], True)
+        if model.propagate:
             self.propagate_value(new_value)
-        yield
-        self.undo_update_range()
-        if FD_Var.propagate:
-            self.undo_propagate_value()
-
-    def undo_propagate_value(self):
-        for v in All_Different.sibs_dict[self]:
-            v.undo_update_range()
+        if not model.matching or model.filter():
+            yield
+        model.trail.undo_to(mark)
 
-    def undo_update_range(self):
-        (self.range, self.was_set) = self.range_was_set_stack[-1]
-        self.range_was_set_stack = self.range_was_set_stack[:-1]
+    def update_domain(self, new_domain, was_set=False):
+        if new_domain != self.domain:
+            self.model.trail.set_attr(self, 'domain', new_domain)
+        if was_set and not self.was_set:
+            self.model.trail.set_attr(self, 'was_set', True)
 
-    def update_range(self, new_range, was_set=False):
-        self.range_was_set_stack = self.range_was_set_stack + [(self.range, self.was_set)]
-        self.range = new_range
-        self.was_set = self.was_set or was_set
+    def size(self):
+        return FD_Universe.size(self.domain)
 
     def value(self):
-        return list(self.range)[0] if self.is_instantiated() else None
+        return self.universe.min(self.domain) if self.is_instantiated() else None
 
 
-@Trace
-def FD_solver(vars: Set[FD_Var]):
-    if any(not v.range for v in vars): return
-    elif not All_Different.all_satisfied(): return
+def FD_solver(model: Model):
+    """
+    If model.trace, print a line for each node, numbered and indented as control_structures.Trace would.
+    (The line numbers and the depth are the model's own, not Trace's globals.)
+    """
+    model.nodes += 1
+    if model.trace:
+        print(f'{" " if model.nodes < 10 else ""} {model.nodes} {"  " * model.depth}vars: {model}')
+    vars = model.vars
+    if any(not v.domain for v in vars): return
+    elif not model.all_satisfied(): return
     elif all(v.is_instantiated() for v in vars): yield
     else:
-        not_set_vars: Set[FD_Var] = {v for v in vars if not v.was_set}
-        nxt_var = min(not_set_vars, key=lambda v: len(v.range)) if FD_Var.smallest_first else \
+        not_set_vars: Set[Model_Var] = {v for v in vars if not v.was_set}
+        nxt_var = min(not_set_vars, key=lambda v: v.size()) if model.smallest_first else \
                   not_set_vars.pop()
-        for _ in nxt_var.member_FD(list(nxt_var.range)):
-            yield from FD_solver(vars)
+        model.depth += 1
+        try:
+            for _ in nxt_var.member_FD(nxt_var.domain_values()):
+                yield from FD_solver(model)
+        finally:
+            model.depth -= 1
+
 
+def bits_in(mask: int) -> Iterator[int]:
+    """ The single-bit masks in mask, lowest first. """
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit
 
-def gen_sets(nbr_sets=5):
+
+def flatten_sets_to_set(sets):
+    return {elt for set in sets for elt in set}
+
+
+def strongly_connected_components(succs: List[List[int]]) -> List[int]:
+    """
+    Tarjan's algorithm on the graph whose nodes are 0 .. len(succs) - 1, where succs[node] lists the successors
+    of node. Returns a list that maps each node to the index of its component. Uses an explicit stack in place
+    of recursion.
+    """
+    index = [-1] * len(succs)
+    low = [0] * len(succs)
+    component = [-1] * len(succs)
+    on_path: List[int] = []
+    count = 0
+    components = 0
+    for root in range(len(succs)):
+        if index[root] >= 0: continue
+        index[root] = low[root] = count
+        count += 1
+        on_path.append(root)
+        work = [(root, iter(succs[root]))]
+        while work:
+            (node, nxts) = work[-1]
+            for nxt in nxts:
+                if index[nxt] < 0:
+                    index[nxt] = low[nxt] = count
+                    count += 1
+                    on_path.append(nxt)
+                    work.append((nxt, iter(succs[nxt])))
+                    break
+                elif component[nxt] < 0:
+                    low[node] = min(low[node], index[nxt])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = on_path.pop()
+                        component[member] = components
+                        if member == node: break
+                    components += 1
+    return component
+
+
+def gen_sets(nbr_sets=5, sets_size_high=None):
     sets_size_low = 2
-    sets_size_high = nbr_sets
+    sets_size_high = nbr_sets if sets_size_high is None else sets_size_high
     vals_size = nbr_sets
     (vals_range_start_min, vals_range_start_max) = (ord('a'), ord('z') + 1 - vals_size)
     alpha_low = randint(vals_range_start_min, vals_range_start_max)
@@ -133,111 +332,18 @@ def gen_sets(nbr_sets=5):
 if __name__ == '__main__':
     print()
     sets = gen_sets()
-    for FD_Var.propagate in [False, True]:
-        for FD_Var.smallest_first in [False, True]:
-            FD_Var.id = 0
-            All_Different.sibs_dict = {}
-            # Create an FV_Var for each set
-            vars = {FD_Var(set) for set in sets}
-            All_Different(vars)
-            print(Trace.to_str(vars))
-            Trace.line_no = 0
-            Trace.trace = True
+    for (propagate, matching) in [(False, False), (True, False), (True, True)]:
+        for smallest_first in [False, True]:
+            model = Model.from_sets(sets, propagate, smallest_first, matching, trace=True)
+            print(model)
             solutions = 0
+            settings = f'propagate: {propagate}; matching: {matching}; smallest_first: {smallest_first};'
             print(f'{"~" * 90}')
-            print(f'propagate: {FD_Var.propagate}; smallest_first: {FD_Var.smallest_first};')
-            for _ in FD_solver(vars):
+            print(settings)
+            for _ in model.solutions():
                 solutions += 1
-                if Trace.trace:  print()
-                print(f"{solutions}. {Trace.to_str(vars)}")
-                if Trace.trace:  print()
-            print(f'propagate: {FD_Var.propagate}; smallest_first: {FD_Var.smallest_first}; '
-                  f'solutions: {solutions}; lines: {Trace.line_no}')
+                if model.trace:  print()
+                print(f"{solutions}. {model}")
+                if model.trace:  print()
+            print(f'{settings} solutions: {solutions}; nodes: {model.nodes}')
             print(f'{"~" * 90}\n')
-
-
-##    ################################### Not currently used ###################################    ##
-
-def ensure_is_FD_Var(x: Union[FD_Var, int, str]) -> FD_Var:
-    """
-      Applied to each argument in a Structure.
-      Applies PyValue to those that are not already Terms.
-      If x is not a logic variable, i.e., an instance of Term, it must be a Python value.
-      Wrap it in PyValue. (It must be immutable.)
-    """
-    return x if isinstance(x, FD_Var) else FD_Var({x})
-
-
-def flatten_sets_to_set(sets):
-    return {elt for set in sets for elt in set}
-
-
-@euc
-def unify_FD(left: FD_Var, right: FD_Var):
-    """
-    Unify two FD_Vars or constants.
-
-    The strategy is to keep track of the "unification unification_chain" for all variables.
-
-    The unification unification_chain is a linked list of logic variables, which are all unified.
-
-    The final element on the unification_chain is either
-    o a non-Var, in which case the value of all preceding variables is the value of that non-Var, or
-    o a Var (which is not linked to any further element), in which case, all variables on the unification_chain
-      are unified but do not (yet) have a value.
-    """
-
-    # Make sure both Left and other are logic variables. This allows us to call, e.g, unify(X, 'abc').
-    # ensure_is_logic_variable will wrap 'abc' in a PyValue.
-    (left, right) = map(ensure_is_FD_Var, (left, right))
-    range_intersection = left.range & right.range
-    if not range_intersection: return
-
-    left.unification_chain_next = left.unification_chain_next = FD_Var(range_intersection)
-    yield
-    left.unification_chain_next = left.unification_chain_next = None
-
-    # if self.value() is not None and self.value() == other.value():
-    #     yield
-    #
-    # # The rest consists of special cases: both PyValues, both Structures, at least one Var.
-    #
-    # # Case 1. Both are PyValues, and exactly one is instantiated.
-    # # "Assign" it's value to the other. This is similar to (but simpler than)
-    # # how we handle two Var's. But instead of building a unification_chain, we "assign"
-    # # one value to the other.
-    # elif isinstance(Left, PyValue) and isinstance(other, PyValue) and \
-    #     (not Left.is_instantiated() or not other.is_instantiated()) and \
-    #     (Left.is_instantiated() or other.is_instantiated()):
-    #     (assignedTo, assignedFrom) = (Left, other) if other.is_instantiated() else (other, Left)
-    #     assignedTo._set_py_value(assignedFrom.get_py_value())
-    #     yield
-    #     # See discussion in unify below for why we do this.
-    #     assignedTo._set_py_value(None)
-    #     #
-    #     # # If they are both PyValues, treat specially.
-    #     # yield from unify_PyValues(Left, other)
-    #
-    #     # # Case 2. Both  Structures. They can be unified if
-    #     # # (a) they have the same functor and
-    #     # # (b) their arguments can be unified.
-    #     # elif isinstance(Left, Structure) and isinstance(other, Structure) and Left.functor == other.functor:
-    #     #     yield from unify_sequences(Left.args, other.args)
-    #     #
-    #     # # Case 3. At least one is a Var. Since we use @euc, it's the end of its unification_chain.
-    #     # # Make the other an extension of its unification_chain.
-    #     # # (If both are Vars, it makes no functional difference which extends which.)
-    #     # elif isinstance(Left, Var) or isinstance(other, Var):
-    #     #     (pointsFrom, pointsTo) = (Left, other) if isinstance(Left, Var) else (other, Left)
-    #     #     pointsFrom.unification_chain_next = pointsTo
-    #     #     yield
-    #
-    #     # All yields create a context in which more of the program is executed--like
-    #     # the body of a while-loop or a for-loop. A "next()" request asks for alternatives.
-    #     # But there is only one functional way to do unification. So on "backup," unlink the
-    #     # two and exit without a further yield, i.e., fail.
-    #
-    #     # This is fundamental! It's what makes it possible for a Var to become un-unified outside
-    #     # the context in which it was unified, e.g., unifying a Var with (successive) members
-    #     # of a list. The first successful unification must be undone before the second can occur.
-    #     pointsFrom.unification_chain_next = None
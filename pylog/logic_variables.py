@@ -1,6 +1,5 @@
 from __future__ import annotations
 from functools import wraps
-from inspect import isgeneratorfunction
 from numbers import Number
 from typing import Any, Iterable, List, Optional, Sequence, Sized, Tuple, Union
 
@@ -19,33 +18,24 @@ The pylog core, this file contains the logic variable and data structure classes
 def euc(f):
   """
   A decorator that takes unification_chain_end() of all Var arguments.
-  comment...
-  """
-
-  def var_unification_chain_end(v):
-    return v.unification_chain_end() if isinstance(v, Var) else v
-
-  def arg_Vars_unification_chain_ends(args):
-    args_unification_chain_ends = (var_unification_chain_end(arg) for arg in args)
-    return args_unification_chain_ends
-
-  def dict_Vars_unification_chain_ends(dic):
-    dic_unification_chain_ends = {k: var_unification_chain_end(v) for (k, v) in dic.items()}
-    return dic_unification_chain_ends
 
-  @wraps(f)
-  def euc_wrapper_gen(*args, **kwargs):
-    args_unification_chain_ends = arg_Vars_unification_chain_ends(args)
-    kwargs_unification_chain_ends = dict_Vars_unification_chain_ends(kwargs)
-    yield from f(*args_unification_chain_ends, **kwargs_unification_chain_ends)
+  Only Vars are dereferenced, whatever the parameters' annotations say: annotations aren't enforced, so a
+  parameter annotated as, e.g., int may still be passed a Var. The keyword arguments are dereferenced only
+  if there are any.
 
+  The same wrapper serves generator and non-generator functions: it returns whatever f returns. So a
+  generator function's generator is returned directly rather than wrapped in a second generator.
+  (This means the arguments are dereferenced when the generator is created rather than when it is first
+  resumed. Generators are almost always run as soon as they are created, e.g., for _ in member(E, Es).)
+  """
   @wraps(f)
-  def euc_wrapper_non_gen(*args, **kwargs):
-    args_unification_chain_ends = arg_Vars_unification_chain_ends(args)
-    kwargs_unification_chain_ends = dict_Vars_unification_chain_ends(kwargs)
-    return f(*args_unification_chain_ends, **kwargs_unification_chain_ends)
+  def euc_wrapper(*args, **kwargs):
+    args = [arg.unification_chain_end( ) if isinstance(arg, Var) else arg for arg in args]
+    if kwargs:
+      kwargs = {k: v.unification_chain_end( ) if isinstance(v, Var) else v for (k, v) in kwargs.items( )}
+    return f(*args, **kwargs)
 
-  return euc_wrapper_gen if isgeneratorfunction(f) else euc_wrapper_non_gen
+  return euc_wrapper
 
 
 class Term:
@@ -66,8 +56,14 @@ class Term:
                                                                                  -------------
                                                                                  |           |
                                                                                PyList      PyTuple
+
+  All the classes in the hierarchy declare __slots__, so Terms carry no per-instance __dict__. We create
+  a great many of them. Subclasses, e.g., StructureItems in puzzles, should declare __slots__ = ( ) (or
+  list their own attributes) to keep the compact layout.
   """
 
+  __slots__ = ('term_id', )
+
   term_count = 0
 
   def __init__(self):
@@ -85,6 +81,18 @@ class Term:
     return self_euc is other_euc or \
            (self is not self_euc or other is not other_euc) and self_euc == other_euc
 
+  def __hash__(self) -> int:
+    """
+    Ground Terms hash structurally, consistently with ==. So they can be used as dict keys and set elements.
+    A Term that is not ground can't be hashed: what it is == to may change as its Vars are bound.
+    Note that a ground Term should be used as a key only while it remains ground, i.e., within the context
+    in which its Vars were bound.
+    """
+    key = self.ground_key( )
+    if key is None:
+      raise TypeError(f"A Term that is not ground can't be hashed: {self}")
+    return hash(key)
+
   def __lt__(self, other: Term) -> bool:
     return str(self) < str(other)
 
@@ -93,15 +101,23 @@ class Term:
 
   def __str__(self) -> str:
     """
-    The str( ) of a Var is (a) the str of its py_value if is_instantiated( ) or (b) its term_id otherwise.
+    The str( ) of a Var is (a) the str of its py_value if is_instantiated( ), (b) that of the Structure or FD_Var
+    at the end of its unification_chain, or (c) its term_id otherwise.
     """
     self_euc = self.unification_chain_end( )
-    return f'{self_euc}' if self_euc.is_instantiated( ) or isinstance(self_euc, Structure) else \
+    return f'{self_euc}' if self_euc.is_instantiated( ) or isinstance(self_euc, (FD_Var, Structure)) else \
            f'_{self_euc.term_id}'
 
   def get_py_value(self) -> Any:
     return None
 
+  def ground_key(self) -> Any:
+    """
+    If this Term is ground, i.e., fully instantiated, a hashable Python value that identifies it structurally:
+    two ground Terms are == iff their ground_keys are ==. Otherwise None.
+    """
+    return None
+
   @euc
   def is_instantiated(self) -> bool:
     """ Should never get here since no unification_chain_end is a Term. """
@@ -119,6 +135,15 @@ def is_immutable(x):
 class PyValue(Term):
   """ A wrapper class for integers, strings, and other immutable Python value. """
 
+  __slots__ = ('_py_value', )
+
+  # The interned constants: {(type(py_value), py_value): PyValue(py_value)}. See PyValue.interned.
+  interned_py_values = {}
+  # Which constants are interned, and at most how many, so that interned_py_values stays small.
+  interned_max_count = 10_000
+  interned_max_int = 1_000
+  interned_max_str_len = 32
+
   def __init__(self, py_value: Optional[str, Number] = None ):
     assert is_immutable(py_value), f"Only immutable values are allowed as PyValues. {py_value} is mutable."
     self._py_value = py_value
@@ -127,6 +152,8 @@ class PyValue(Term):
   def __add__(self, other):
     return PyValue(self.get_py_value() + other.get_py_value())
 
+  __hash__ = Term.__hash__
+
   def __eq__(self, other: Term) -> bool:
     other_euc = other.unification_chain_end()
     return (isinstance(other_euc, PyValue) and
@@ -141,6 +168,34 @@ class PyValue(Term):
   def __str__(self) -> str:
     return '_' if self._py_value is None else f'{self._py_value}'
 
+  @staticmethod
+  def interned(py_value: Any) -> PyValue:
+    """
+    The shared PyValue for a ground str, int, or bool constant. Equal constants get the same PyValue,
+    and the immutability check is done only when the constant is first seen.
+
+    Interned PyValues are kept forever, so only small constants are interned: bools, ints within
+    interned_max_int of 0, and strs of at most interned_max_str_len characters, up to interned_max_count
+    of them. Those are the constants that puzzles and lists use over and over. Other values, including
+    floats, get a fresh PyValue.
+
+    This is safe alongside _set_py_value and unify's assignment to uninstantiated PyValues: those always
+    target a PyValue whose py_value is None, and None is never interned.
+    (Floats are excluded because, e.g., 0.0 and -0.0 are equal but print differently.)
+    The type is part of the key so that, e.g., 1 and True get different PyValues.
+    """
+    py_type = type(py_value)
+    key = (py_type, py_value)
+    Interned = PyValue.interned_py_values.get(key) if py_type in (str, int, bool) else None
+    if Interned is None:
+      Interned = PyValue(py_value)
+      if (py_type is bool or
+          py_type is int and -PyValue.interned_max_int <= py_value <= PyValue.interned_max_int or
+          py_type is str and len(py_value) <= PyValue.interned_max_str_len) and \
+         len(PyValue.interned_py_values) < PyValue.interned_max_count:
+        PyValue.interned_py_values[key] = Interned
+    return Interned
+
   # This instantiates a PyValue, which had been None. This is dangerous since it mutates this object.
   def _set_py_value(self, py_value):
     assert is_immutable(py_value), f"Only immutable values are allowed as PyValues. {py_value} is mutable."
@@ -149,6 +204,10 @@ class PyValue(Term):
   def get_py_value(self) -> Any:
     return self._py_value
 
+  def ground_key(self) -> Any:
+    """ The py_value itself, which is None if this PyValue is not instantiated. """
+    return self._py_value
+
   @staticmethod
   def get_py_values(Vars: List[Union[Var, PyValue]]):
     return [v.get_py_value( ) for v in Vars]
@@ -157,27 +216,95 @@ class PyValue(Term):
     return self.get_py_value() is not None
 
 
+class GroundKey:
+  """
+  The ground_key of a ground Structure: its functor and the ground_keys of its args. Its hash is computed from
+  theirs when it is built, and == walks nested GroundKeys with an explicit stack. So neither hashing nor
+  comparing the key of, e.g., a long LinkedList recurses.
+  """
+
+  __slots__ = ('functor', 'arg_keys', 'hash')
+
+  def __init__(self, functor: Any, arg_keys: Tuple):
+    self.functor = functor
+    self.arg_keys = arg_keys
+    self.hash = hash( (Structure, functor, arg_keys) )
+
+  def __eq__(self, other: Any) -> bool:
+    pairs = [(self, other)]
+    while pairs:
+      (key_1, key_2) = pairs.pop( )
+      if key_1 is key_2:
+        continue
+      if isinstance(key_1, GroundKey) or isinstance(key_2, GroundKey):
+        if not (isinstance(key_1, GroundKey) and isinstance(key_2, GroundKey) and key_1.hash == key_2.hash and
+                key_1.functor == key_2.functor and len(key_1.arg_keys) == len(key_2.arg_keys)):
+          return False
+        pairs.extend(zip(key_1.arg_keys, key_2.arg_keys))
+      elif key_1 != key_2:
+        return False
+    return True
+
+  def __hash__(self) -> int:
+    return self.hash
+
+
 class Structure(Term):
   """
   self.functor is the functor
   self.args is a tuple of args
+  self._ground is None unless this Structure is known to be ground. Then it is (hash(ground_key), ground_key).
   """
+
+  __slots__ = ('functor', 'args', '_ground')
+
   def __init__(self, term: Tuple = ( None, () ) ):
     self.functor = term[0]
     self.args = tuple(map(ensure_is_logic_variable, term[1:]))
+    self._ground = None
     super().__init__()
 
   def __eq__(self, other: Term) -> bool:
+    """
+    If both are ground, compare the cached hashes and then the ground_keys. Otherwise compare the args pairwise.
+    The pairs are kept on an explicit stack, as in bind_sequences, so long lists don't hit the recursion limit.
+    Below the top, the ground_keys are used only if they are already cached: looking for one in a Structure
+    that isn't ground would walk it again at every level.
+    """
     other_euc = other.unification_chain_end()
-    return (other_euc is self or
-            isinstance(other_euc, Structure) and
-            self.functor == other_euc.functor and
-            len(self.args) == len(other_euc.args) and
-            all([selfArg == other_eucArg for (selfArg, other_eucArg) in zip(self.args, other_euc.args)]))
+    if other_euc is self:
+      return True
+    if not isinstance(other_euc, Structure):
+      return False
+    self.ground_key( )
+    other_euc.ground_key( )
+    pairs = [(self, other_euc)]
+    while pairs:
+      (Left, Right) = pairs.pop( )
+      (Left, Right) = (Left.unification_chain_end( ), Right.unification_chain_end( ))
+      if Left is Right:
+        continue
+      if not (isinstance(Left, Structure) and isinstance(Right, Structure)):
+        if Left != Right:
+          return False
+      elif Left._ground is not None and Right._ground is not None:
+        if Left._ground[0] != Right._ground[0] or Left._ground[1] != Right._ground[1]:
+          return False
+      elif Left.functor != Right.functor or len(Left.args) != len(Right.args):
+        return False
+      else:
+        pairs.extend(zip(Left.args, Right.args))
+    return True
 
   def __getitem__(self, key: Union[int, slice]):
     return self.args[key]
 
+  def __hash__(self) -> int:
+    """ The hash is computed along with the ground_key and cached with it. See Term.__hash__. """
+    if self.ground_key( ) is None:
+      raise TypeError(f"A Term that is not ground can't be hashed: {self}")
+    return self._ground[0]
+
   # noinspection PySimplifyBooleanCheck
   def __str__(self):
     args_str = self.values_string(self.args)
@@ -188,10 +315,45 @@ class Structure(Term):
     py_value_args = [arg.get_py_value() for arg in self.args]
     return Structure( (self.functor, *py_value_args) )
 
+  def ground_key(self) -> Any:
+    """
+    A GroundKey(functor, ground_keys of the args) if all the args are ground. Otherwise None.
+
+    Once a Structure is ground, it stays ground until backtracking undoes one of the bindings that
+    made it ground. So the result is cached in self._ground, and the caching is recorded on the Trail.
+    (See Trail.cache.) Since it is recorded after those bindings, backtracking past any of them also
+    clears the cache.
+
+    The Structures below this one are walked with an explicit stack rather than recursively, so long lists
+    and deeply nested Structures don't hit the recursion limit. Each Structure's key is built after those
+    of its args. The walk stops at the first arg that is not ground.
+    """
+    if self._ground is None:
+      stack = [self]
+      while stack:
+        S = stack[-1]
+        if S._ground is not None:
+          stack.pop( )
+          continue
+        args = [arg.unification_chain_end( ) for arg in S.args]
+        pending = []
+        for arg in args:
+          if isinstance(arg, Structure):
+            if arg._ground is None:
+              pending.append(arg)
+          elif arg.ground_key( ) is None:
+            return None
+        if pending:
+          stack.extend(pending)
+          continue
+        key = GroundKey(S.functor, tuple(arg.ground_key( ) for arg in args))
+        Trail.cache(S, '_ground', (key.hash, key))
+        stack.pop( )
+    return self._ground[1]
+
   def is_instantiated(self) -> bool:
-    """ A Structure is instantiated if all its args are. """
-    args_are_instantiated = all(arg.is_instantiated() for arg in self.args)
-    return args_are_instantiated
+    """ A Structure is instantiated if all its args are, i.e., if it is ground. """
+    return self.ground_key( ) is not None
 
   @staticmethod
   def values_string(values: Iterable):
@@ -206,6 +368,8 @@ class StructureItem(Structure):
   A utility class for building and displaying Structure-based items.
   """
 
+  __slots__ = ('first_arg_as_str_functor', )
+
   def __init__(self, args, first_arg_as_str_functor=False):
     self.first_arg_as_str_functor = first_arg_as_str_functor
     functor = type(self).__name__.lower( )
@@ -231,11 +395,11 @@ class Var(Term):
   A logic variable
   """
 
+  __slots__ = ('unification_chain_next', )
+
   def __init__(self):
     # self.unification_chain_next points to the next element on the unification_chain, if any.
     self.unification_chain_next = None
-    # self.range = init_range
-    # self.range_stack = []
     super().__init__()
 
   def __add__(self, other):
@@ -266,6 +430,10 @@ class Var(Term):
   def get_py_value(self) -> Optional[Any]:
     return self.get_py_value( ) if self.is_instantiated( ) else None
 
+  def ground_key(self) -> Any:
+    Chain_End = self.unification_chain_end( )
+    return None if Chain_End is self else Chain_End.ground_key( )
+
   # Can't use @euc. Generates an infinite recursive loop.
   def is_instantiated(self) -> bool:
     """ A Var is_instantiated if its unification_chain end is_instantiated """
@@ -275,43 +443,150 @@ class Var(Term):
   def unification_chain_end(self):
     """
     return: the Term, whatever it is, at the end of this Var's unification unification_chain.
+
+    Walks the chain iteratively, so long chains (e.g., those built by member on open LinkedLists) don't
+    hit the recursion limit. It also compresses the path: each Var passed along the way is made to point
+    directly to the end. The compression is recorded on the Trail (if there is anything on it to undo),
+    so backtracking restores the chain. See Trail.cache.
     """
-    return self.unification_chain_next.unification_chain_end( ) if self._has_unification_chain_next( ) else self
-
-
-# class FD_Var(Var):
-#   """
-#   A Finite Domain variable
-#   """
-#
-#   def __init__(self, name=None, init_range=None):
-#     # self.unification_chain_next points to the next element on the unification_chain, if any.
-#     self.name = name
-#     self.range = init_range
-#     self.range_stack = []
-#     super().__init__()
-#
-#   def __str__(self):
-#     name_part = self.name + ': ' if self.name is not None else ''
-#     return f'{name_part}{self.range}' if self.range is not None else super().__str__()
-#
-#   def undo_update(self):
-#     self.range = self.range_stack[-1]
-#     self.range_stack = self.range_stack[:-1]
-#
-#   def update_range(self, new_range):
-#     self.range_stack.append(self.range)
-#     self.range = new_range
-#
-#
+    Next = self.unification_chain_next
+    # The common cases: self is the end, or self points directly to the end.
+    if Next is None:
+      return self
+    if not isinstance(Next, Var) or Next.unification_chain_next is None:
+      return Next
+
+    Chain_End = Next
+    while isinstance(Chain_End, Var) and Chain_End.unification_chain_next is not None:
+      Chain_End = Chain_End.unification_chain_next
+
+    V = self
+    while V.unification_chain_next is not Chain_End:
+      Next = V.unification_chain_next
+      Trail.cache(V, 'unification_chain_next', Chain_End)
+      V = Next
+    return Chain_End
+
+
+class FD_Universe:
+  """
+  The values that a problem's FD_Vars may take, each with its own bit. A domain, i.e., a set of these values,
+  is then an int bitmask: intersection, removal, and emptiness are single int operations, and a snapshot of a
+  domain is just the int. This works for any hashable values, e.g., the letters of a transversal problem.
+
+  If the values can be sorted, the bits are assigned in sorted order, so the smallest and largest values in
+  a domain are its lowest and highest bits.
+  """
+
+  __slots__ = ('values', 'bits')
+
+  def __init__(self, values: Iterable):
+    values = list(dict.fromkeys(values))
+    try:
+      values.sort( )
+    except TypeError:
+      pass
+    self.values = tuple(values)
+    self.bits = {value: 1 << i for (i, value) in enumerate(self.values)}
+
+  def mask(self, values: Iterable) -> int:
+    """ The domain consisting of values. (They must all be in this universe.) """
+    mask = 0
+    for value in values:
+      mask |= self.bits[value]
+    return mask
+
+  def max(self, mask: int) -> Any:
+    return self.values[mask.bit_length( ) - 1]
+
+  def min(self, mask: int) -> Any:
+    return self.values[(mask & -mask).bit_length( ) - 1]
+
+  @staticmethod
+  def size(mask: int) -> int:
+    """ The number of values in the domain mask. (int.bit_count is new in Python 3.10.) """
+    return mask.bit_count( )
+
+  if not hasattr(int, 'bit_count'):
+    size = staticmethod(lambda mask: bin(mask).count('1'))
+
+  def values_in(self, mask: int) -> List[Any]:
+    """ The values in the domain mask, in bit order. """
+    values = []
+    while mask:
+      bit = mask & -mask
+      mask ^= bit
+      values.append(self.values[bit.bit_length( ) - 1])
+    return values
+
+
+class FD_Var(Var):
+  """
+  A Finite Domain variable: a Var whose value must come from its domain, a set of Python values.
+  The domain is an int bitmask over self.universe. (See FD_Universe.) FD_Vars from the same problem
+  should share a universe. If no universe is given, the FD_Var gets one of its own.
+
+  FD_Vars take part in ordinary unification. (See bind_sequences.) Unifying an FD_Var
+  o with an instantiated PyValue succeeds only if the value is in the domain: a dict lookup and a bit test;
+  o with another FD_Var intersects their domains. The narrowed domain is set on the Trail, so backtracking
+    restores the original. If the intersection has a single value, both are bound to it;
+  o with a Var binds the Var to the FD_Var, which keeps its domain.
+  An FD_Var does not unify with a Structure or with an uninstantiated PyValue.
+  """
+
+  __slots__ = ('domain', 'name', 'universe')
+
+  def __init__(self, domain: Iterable, name: Optional[str] = None, universe: Optional[FD_Universe] = None):
+    domain = list(domain)
+    self.universe = FD_Universe(domain) if universe is None else universe
+    self.domain = self.universe.mask(domain)
+    self.name = name
+    super().__init__()
+
+  def __str__(self):
+    """ Its name, if any, and its domain, which is that of the FD_Var at the end of its unification_chain. """
+    self_euc = self.unification_chain_end( )
+    if not isinstance(self_euc, FD_Var):
+      return str(self_euc)
+    name_part = '' if self.name is None else f'{self.name}: '
+    return f'{name_part}{{{", ".join(map(str, self_euc.domain_values( )))}}}'
+
+  def domain_values(self) -> List[Any]:
+    return self.universe.values_in(self.domain)
+
+  def narrow_to(self, Other: Term) -> bool:
+    """
+    Bind this FD_Var to Other, which is not a plain Var. Both are the ends of their unification_chains.
+    Return whether that's possible. Called by bind_sequences, which also takes care of undoing.
+    """
+    if isinstance(Other, PyValue):
+      if not Other.is_instantiated( ) or not self.domain & self.universe.bits.get(Other.get_py_value( ), 0):
+        return False
+    elif isinstance(Other, FD_Var):
+      universe = Other.universe
+      common = Other.domain & (self.domain if self.universe is universe else
+                               universe.mask(value for value in self.domain_values( ) if value in universe.bits))
+      if not common:
+        return False
+      if not common & (common - 1):
+        # A single value.
+        Trail.set_attr(Other, 'unification_chain_next', PyValue.interned(universe.min(common)))
+      elif common != Other.domain:
+        Trail.set_attr(Other, 'domain', common)
+    else:
+      return False
+    Trail.set_attr(self, 'unification_chain_next', Other)
+    return True
+
+
 def ensure_is_logic_variable(x: Any) -> Term:
   """
     Applied to each argument in a Structure.
     Applies PyValue to those that are not already Terms.
     If x is not a logic variable, i.e., an instance of Term, it must be a Python value.
-    Wrap it in PyValue. (It must be immutable.)
+    Wrap it in PyValue. (It must be immutable.) Constants share interned PyValues. See PyValue.interned.
   """
-  return x if isinstance(x, Term) else PyValue(x)
+  return x if isinstance(x, Term) else PyValue.interned(x)
 
 
 def make_property(prop):
@@ -328,11 +603,76 @@ def n_Vars(n: int) -> List[Var]:
   return [Var( ) for _ in range(n)]
 
 
+class Undo_Trail:
+  """
+  A trail of attribute changes, each recorded as (term, attribute, old_value), that can be undone.
+
+  A choicepoint is simply the length of the trail at some moment: trail.mark( ). Backtracking to a
+  choicepoint restores, in reverse order, every attribute recorded since that mark: trail.undo_to(mark).
+
+  Trail, below, is the binding trail, on which unify records every binding it makes. This replaces the
+  earlier strategy in which each binding was undone by code that ran after its own yield. That strategy
+  required a live generator frame for every binding. With the trail, unify binds all the variables in a
+  pair of Structures (or sequences) in a single step and undoes them all in a single loop.
+
+  Code that keeps state of its own can keep it on a trail of its own, e.g., the Model of a transversal
+  problem. (See examples/transversals/transversals_FD.py.)
+  """
+
+  __slots__ = ('entries', )
+
+  def __init__(self):
+    self.entries: List[Tuple[Any, str, Any]] = []
+
+  def mark(self) -> int:
+    """ The current choicepoint. """
+    return len(self.entries)
+
+  def set_attr(self, term: Any, attr: str, value: Any):
+    """ Set term.attr to value, recording its current value so that it can be restored on backtracking. """
+    self.entries.append( (term, attr, getattr(term, attr)) )
+    setattr(term, attr, value)
+
+  def undo_to(self, mark: int):
+    """ Restore everything recorded since mark. """
+    entries = self.entries
+    while len(entries) > mark:
+      (term, attr, old_value) = entries.pop( )
+      setattr(term, attr, old_value)
+
+  def cache(self, term: Any, attr: str, value: Any):
+    """
+    Set term.attr to a value derived from the current bindings, e.g., a compressed unification_chain.
+    If the trail is empty, none of those bindings can be undone, so the value can't go stale and is simply
+    set. Otherwise it is recorded, as in set_attr. So caching at top level doesn't leave entries on the
+    trail that are never popped (and that would keep their terms alive).
+    """
+    if self.entries:
+      self.entries.append( (term, attr, getattr(term, attr)) )
+    setattr(term, attr, value)
+
+
+# The binding trail. See Undo_Trail.
+Trail = Undo_Trail( )
+
+
+def bind(Left: Any, Right: Any) -> bool:
+  """
+  The non-generator core of unify. Perform (and record on the Trail) all the bindings needed to unify
+  Left and Right. Return whether the unification succeeded. Does not undo anything, even on failure.
+  That is the job of whoever took the Trail mark. (See unify.)
+  """
+  return bind_sequences((Left,), (Right,))
+
+
 # noinspection PyProtectedMember
-@euc
-def unify(Left: Any, Right: Any):
+def bind_sequences(seq_1: Sequence, seq_2: Sequence) -> bool:
   """
-  Unify two logic Terms.
+  The non-generator core of unify_sequences. See bind.
+
+  Walks the argument pairs with an index into the current pair of sequences. When it meets two Structures,
+  it saves (seq_1, seq_2, index) on an explicit stack and continues with the Structures' args. So neither
+  the sequences nor nested Structures cost any recursion or slicing.
 
   The strategy is to keep track of the "unification unification_chain" for all variables.
 
@@ -343,92 +683,115 @@ def unify(Left: Any, Right: Any):
   o a Var (which is not linked to any further element), in which case, all variables on the unification_chain
     are unified but do not (yet) have a value.
   """
+  if len(seq_1) != len(seq_2):
+    return False
 
-  # Make sure both Left and Right are logic variables. This allows us to call, e.g, unify(X, 'abc').
-  # ensure_is_logic_variable will wrap 'abc' in a PyValue.
-  (Left, Right) = map(ensure_is_logic_variable, (Left, Right))
-
-  # If the unification_chain_ends are equal, either because they have the same py_value or Structure or
-  # because they are the same (unbound) Var, do nothing. They are already unified.
-  # yield to indicate unification success. If Left and Right are both
-  # uninstantiated PyValues, Left != Right. (See PyValue.__eq__.)
-  if Left == Right:
-    yield
-
-  # The rest consists of special cases: both PyValues, both Structures, at least one Var.
-
-  # Case 1. Both are PyValues, and exactly one is instantiated.
-  # "Assign" it's value to the other. This is similar to (but simpler than)
-  # how we handle two Var's. But instead of building a unification_chain, we "assign"
-  # one value to the other.
-  elif isinstance(Left, PyValue) and isinstance(Right, PyValue) and \
-       (not Left.is_instantiated( ) or not Right.is_instantiated( )) and \
-       (Left.is_instantiated( ) or Right.is_instantiated( )):
-    (assignedTo, assignedFrom) = (Left, Right) if Right.is_instantiated( ) else (Right, Left)
-    assignedTo._set_py_value(assignedFrom.get_py_value( ))
-    yield
-    # See discussion in unify below for why we do this.
-    assignedTo._set_py_value(None)
-    #
-    # # If they are both PyValues, treat specially.
-    # yield from unify_PyValues(Left, Right)
-    
-  # Case 2. Both  Structures. They can be unified if
-  # (a) they have the same functor and
-  # (b) their arguments can be unified.
-  elif isinstance(Left, Structure) and isinstance(Right, Structure) and Left.functor == Right.functor:
-    yield from unify_sequences(Left.args, Right.args)
-
-  # Case 3. At least one is a Var. Since we use @euc, it's the end of its unification_chain.
-  # Make the other an extension of its unification_chain.
-  # (If both are Vars, it makes no functional difference which extends which.)
-  elif isinstance(Left, Var) or isinstance(Right, Var):
-    (pointsFrom, pointsTo) = (Left, Right) if isinstance(Left, Var) else (Right, Left)
-    pointsFrom.unification_chain_next = pointsTo
-    yield
-    # All yields create a context in which more of the program is executed--like
-    # the body of a while-loop or a for-loop. A "next()" request asks for alternatives.
-    # But there is only one functional way to do unification. So on "backup," unlink the
-    # two and exit without a further yield, i.e., fail.
-
-    # This is fundamental! It's what makes it possible for a Var to become un-unified outside
-    # the context in which it was unified, e.g., unifying a Var with (successive) members
-    # of a list. The first successful unification must be undone before the second can occur.
-    pointsFrom.unification_chain_next = None
-
-    
-def unify_pairs(tuples: List[Tuple[Any, Any]]):
-  """ Apply unify to pairs of terms. """
-  # If no more tuples, we are done.
-  if not tuples:
-    yield
-  else:
-    # Get the first tuple from the tuples list.
-    [(Left, Right), *restOfTuples] = tuples
-    # If they unify, go on to the rest of the tuples list.
-    for _ in unify(Left, Right):
-      yield from unify_pairs(restOfTuples)
-    # The preceding is equivalent to the following.
-    # for _ in forall([lambda: unify(Left, Right),
-    #                  lambda: unify_pairs(restOfTuples)]):
-    #   yield
+  stack = []
+  (index, length) = (0, len(seq_1))
+  while True:
+    if index == length:
+      # Done with this pair of sequences. Go back to the enclosing pair, if any.
+      if not stack:
+        return True
+      (seq_1, seq_2, index) = stack.pop( )
+      length = len(seq_1)
+      continue
+
+    # Make sure both Left and Right are logic variables. This allows us to call, e.g, unify(X, 'abc').
+    # ensure_is_logic_variable will wrap 'abc' in a PyValue.
+    Left = ensure_is_logic_variable(seq_1[index]).unification_chain_end( )
+    Right = ensure_is_logic_variable(seq_2[index]).unification_chain_end( )
+    index += 1
+
+    # Case 1. At least one is a Var. Since we took unification_chain_end( ), it's the end of its unification_chain.
+    # Make the other an extension of its unification_chain.
+    # (If both are plain Vars, it makes no functional difference which extends which.)
+    # If they are the same (unbound) Var, do nothing. They are already unified.
+    # An FD_Var may be narrowed rather than simply extended, and it may refuse. (See FD_Var.)
+    # A plain Var always extends an FD_Var's unification_chain, so that the FD_Var keeps its domain.
+    if isinstance(Left, Var) or isinstance(Right, Var):
+      if Left is not Right:
+        (pointsFrom, pointsTo) = (Left, Right) if isinstance(Left, Var) else (Right, Left)
+        if not isinstance(pointsFrom, FD_Var) and not isinstance(pointsTo, FD_Var):
+          Trail.set_attr(pointsFrom, 'unification_chain_next', pointsTo)
+        elif isinstance(pointsTo, Var) and not isinstance(pointsTo, FD_Var):
+          Trail.set_attr(pointsTo, 'unification_chain_next', pointsFrom)
+        elif not isinstance(pointsFrom, FD_Var):
+          Trail.set_attr(pointsFrom, 'unification_chain_next', pointsTo)
+        elif not pointsFrom.narrow_to(pointsTo):
+          return False
+
+    # Case 2. Both are PyValues. If they have the same py_value, do nothing.
+    # If exactly one is instantiated, "assign" it's value to the other. This is similar to (but simpler than)
+    # how we handle two Var's. But instead of building a unification_chain, we "assign" one value to the other.
+    # If Left and Right are both uninstantiated PyValues, they don't unify. (See PyValue.__eq__.)
+    elif isinstance(Left, PyValue) and isinstance(Right, PyValue):
+      if Left == Right:
+        continue
+      if Left.is_instantiated( ) == Right.is_instantiated( ):
+        return False
+      (assignedTo, assignedFrom) = (Left, Right) if Right.is_instantiated( ) else (Right, Left)
+      Trail.set_attr(assignedTo, '_py_value', assignedFrom.get_py_value( ))
+
+    # Case 3. Both  Structures. They can be unified if
+    # (a) they have the same functor and
+    # (b) their arguments can be unified.
+    elif isinstance(Left, Structure) and isinstance(Right, Structure):
+      if Left is Right:
+        continue
+      if Left.functor != Right.functor or len(Left.args) != len(Right.args):
+        return False
+      stack.append( (seq_1, seq_2, index) )
+      (seq_1, seq_2, index, length) = (Left.args, Right.args, 0, len(Left.args))
 
+    else:
+      return False
 
-def unify_sequences(seq_1: Sequence, seq_2: Sequence):
-  """ Unify simple sequences, e.g., lists or tuples, of Terms. """
-  # The two sequences must be the same length.
-  if len(seq_1) != len(seq_2):
-    return
 
-  # If they are both empty, we are done.
-  if len(seq_1) == 0:
-    yield
+@euc
+def unify(Left: Any, Right: Any):
+  """
+  Unify two logic Terms. See bind for the details.
+
+  All yields create a context in which more of the program is executed--like
+  the body of a while-loop or a for-loop. A "next()" request asks for alternatives.
+  But there is only one functional way to do unification. So on "backup," undo the
+  bindings and exit without a further yield, i.e., fail.
+
+  This is fundamental! It's what makes it possible for a Var to become un-unified outside
+  the context in which it was unified, e.g., unifying a Var with (successive) members
+  of a list. The first successful unification must be undone before the second can occur.
+
+  The bindings are also undone if the caller abandons this generator, e.g., breaks out of a loop over it:
+  closing the generator runs the finally clause. (A caller that means to keep the bindings should call bind.)
+  Otherwise they would stay on the Trail for good.
+  """
+  mark = Trail.mark( )
+  try:
+    if bind(Left, Right):
+      yield
+  finally:
+    Trail.undo_to(mark)
+
 
-  else:
-    # Unify the two first elements. If successful go on to the rest.
-    # Note that slice notation is supported.
-    for _ in unify(seq_1[0], seq_2[0]):
-      yield from unify_sequences(seq_1[1:], seq_2[1:])
+def unify_pairs(tuples: List[Tuple[Any, Any]]):
+  """ Apply unify to pairs of terms. (As in unify, the bindings are undone even if this is abandoned.) """
+  mark = Trail.mark( )
+  try:
+    if all(bind(Left, Right) for (Left, Right) in tuples):
+      yield
+  finally:
+    Trail.undo_to(mark)
+
+
+def unify_sequences(seq_1: Sequence, seq_2: Sequence):
+  """ Unify simple sequences, e.g., lists or tuples, of Terms. (See unify on abandoning this.) """
+  mark = Trail.mark( )
+  try:
+    if bind_sequences(seq_1, seq_2):
+      yield
+  finally:
+    Trail.undo_to(mark)
 
 
 if __name__ == '__main__':
@@ -446,6 +809,19 @@ if __name__ == '__main__':
     print(f'd) B: {B}; C: {C}')
   print(f'e) B: {B}; C: {C}')
 
+  A = FD_Var({1, 2, 3}, 'A')
+  D = FD_Var({2, 3, 4}, 'D')
+  print(f'\nf) {A}; {D}')
+  print(f'Attempting: unify(A, 4). Fails: 4 is not in the domain of A.')
+  for _ in unify(A, 4):
+    print("Shouldn't have succeeded.")
+  print(f'Attempting: unify(A, D). Their domains are intersected.')
+  for _ in unify(A, D):
+    print(f'g) {A}; {D}')
+    for _ in unify(D, 3):
+      print(f'h) unify(D, 3) => A: {A}; D: {D}')
+  print(f'i) {A}; {D}')
+
 
   # print('As expected, unify_pairs fails -- because A and D have distinct PyValues.')
   #
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
 
-from logic_variables import ensure_is_logic_variable, euc, PyValue, n_Vars, Term, unify, unify_pairs, Var
+from control_structures import trampolined
+from logic_variables import bind, bind_sequences, ensure_is_logic_variable, euc, PyValue, n_Vars, Term, Trail, unify, unify_pairs, Var
 from sequence_options.super_sequence import is_a_subsequence_of,  member, SuperSequence
 
 
@@ -15,7 +16,14 @@ class LinkedList(SuperSequence):
 
   When used as a constructor, the argument must be either a Python list or a (Head, Tail) tuple.
   In the second case, Tail must be a LinkedList or a Var.
+  To build a list from any iterable, optionally with an open (Var) tail, use LinkedList.from_iterable.
+  All closed lists built this way share emptyLinkedList as their final tail.
+
+  self._closed_prefix caches the tuple of elements once the list is known to be closed. (See closed_prefix.)
   """
+
+  __slots__ = ('_closed_prefix', )
+
   def __init__(self, list_or_tuple: Union[list, str, Term, tuple], tail: Optional[Term] = None ):
     # args will either have two elements or none -- if we are creating an empty list.
     if tail is None:
@@ -24,10 +32,12 @@ class LinkedList(SuperSequence):
              self.args_from_pyList(list(list_or_tuple))  # Run list_or_tuple to get a list if it's a generator.
     else:
       args = (list_or_tuple, tail)
+    self._closed_prefix = None
     super().__init__( ('linkedList', *args) )
 
   def __getitem__(self, key: Union[int, slice]):
-    (prefix, tail) = self.prefix_and_tail( )
+    elements = self.closed_prefix( )
+    (prefix, tail) = (elements, []) if elements is not None else self.prefix_and_tail( )
     stop = key if isinstance(key, int) else \
            key.stop if isinstance(key.stop, int) else \
            len(self) if key.stop is None else \
@@ -37,16 +47,21 @@ class LinkedList(SuperSequence):
       if isinstance(key, int):
         return slice_elements
       else:
-        return LinkedList(slice_elements)
+        return LinkedList(list(slice_elements))
     if not isinstance(tail, Var):
       return None
+    # Extend this list to the length of template. The bindings are kept, so use bind rather than unify.
     template = LinkedList(n_Vars(stop))
-    for _ in unify(self, template):
-      (prefix, _) = template.prefix_and_tail()
-      return LinkedList(prefix[key])
+    mark = Trail.mark( )
+    if not bind(self, template):
+      Trail.undo_to(mark)
+      return None
+    (prefix, _) = template.prefix_and_tail()
+    return LinkedList(prefix[key])
 
   def __len__(self):
-    return len(self.to_python_list())
+    elements = self.closed_prefix( )
+    return len(elements) if elements is not None else len(self.to_python_list())
 
   def __str__(self):
     (prefix, tail) = self.prefix_and_tail( )
@@ -62,8 +77,45 @@ class LinkedList(SuperSequence):
     :param pyList: a standard Python list
     :return: (nested) args for a LinkedList, i.e, (head, tail) of pylist.
     """
-    # return ( ) if not pyList else ( Term.ensure_is_logic_variable(pyList[0]), LinkedList(pyList[1:]) )
-    return ( ) if not pyList else ( ensure_is_logic_variable(pyList[0]), LinkedList(pyList[1:]) )
+    return ( ) if not pyList else ( ensure_is_logic_variable(pyList[0]), LinkedList.cons_cells(pyList, 1) )
+
+  @staticmethod
+  def cons_cells(elements: Sequence, start: int = 0, tail: Optional[Term] = None) -> Union[LinkedList, Term]:
+    """
+    The LinkedList of elements[start:] followed by tail, which defaults to emptyLinkedList.
+    Builds the cons cells back to front in a single loop: no slicing and no recursion.
+    """
+    A_List = emptyLinkedList if tail is None else tail
+    for i in range(len(elements) - 1, start - 1, -1):
+      A_List = LinkedList(elements[i], A_List)
+    return A_List
+
+  @staticmethod
+  def from_iterable(elements: Iterable, tail: Optional[Term] = None) -> Union[LinkedList, Term]:
+    """
+    Build a LinkedList from any iterable, including a generator. If tail is given, typically a Var,
+    the list ends with it, i.e., it is open. Otherwise, the list is closed. (If elements is empty,
+    the result is tail itself, since there is no LinkedList that is nothing but a tail.)
+    """
+    return LinkedList.cons_cells(elements if isinstance(elements, (list, tuple)) else list(elements), 0, tail)
+
+  def closed_prefix(self) -> Optional[Tuple[Term, ...]]:
+    """
+    If this list is closed, i.e., its final tail is the empty list, the tuple of its elements. Otherwise None.
+
+    Once a list is closed, its elements stay fixed until backtracking undoes one of the bindings that
+    closed it. So the tuple is cached in self._closed_prefix, and the caching is recorded on the Trail,
+    which clears it on backtracking. (See Trail.cache: at top level, nothing is recorded.)
+    """
+    if self._closed_prefix is None:
+      (prefix, tail) = self.prefix_and_tail( )
+      if isinstance(tail, Var):
+        return None
+      Trail.cache(self, '_closed_prefix', tuple(prefix))
+    return self._closed_prefix
+
+  def closed_elements(self) -> Optional[Tuple[Term, ...]]:
+    return self.closed_prefix( )
 
   def get_py_value(self):
     args_list = self.to_python_list()
@@ -71,38 +123,59 @@ class LinkedList(SuperSequence):
     return py_value_args
 
   def has_contiguous_sublist(self, As: List):
-    """ Can As be unified with a segment of this list? """
-    # Initially, As is a standard Python list. Make it a LinkedList.
-    As = LinkedList(As)
-    (len_As, len_self) = (len(As), len(self))
+    """
+    Can As be unified with a segment of this list?
+
+    Slides a window of len(As) along the elements, which are walked once. If the list is open, windows that
+    run past the end of its elements extend the tail, one more element per window: this list is as long as
+    it needs to be and no longer. So an open list has infinitely many segments.
+    """
+    As = As.to_python_list( ) if isinstance(As, SuperSequence) else As
+    len_As = len(As)
     if len_As == 0:
       yield  # Succeed once.
-    elif len_As > len_self:
-      return  # Fail.
-    else:
-      (Xs, Ys) = n_Vars(2)
-      # Succeed if we can find a way to divide self into Xs and Ys so that As is an initial sublist of Ys.
-      # for _ in forall([lambda: append(Xs, Ys, self),
-      #                  lambda: append(As, Var( ), Ys)
-      #                  ]):
-      #   yield
-      for _ in append(Xs, Ys, self):
-        yield from append(As, Var( ), Ys)
+      return
+    (prefix, tail) = self.prefix_and_tail( )
+    len_prefix = len(prefix)
+    # The windows that lie entirely within the elements.
+    for i in range(len_prefix - len_As + 1):
+      mark = Trail.mark( )
+      if bind_sequences(As, prefix[i:i + len_As]):
+        yield
+      Trail.undo_to(mark)
+    if not isinstance(tail, Var):
+      return
+    # The windows that start at i and overhang the end of the elements. The first (len_prefix - i) of As unify
+    # with the last elements. The tail is bound to (i - len_prefix) padding Vars, the rest of As, and a new Var.
+    i = max(0, len_prefix - len_As + 1)
+    while True:
+      overlap = max(0, len_prefix - i)
+      mark = Trail.mark( )
+      if bind_sequences(As[:overlap], prefix[i:]) and \
+         bind(tail, LinkedList.cons_cells([*n_Vars(max(0, i - len_prefix)), *As[overlap:]], 0, Var( ))):
+        yield
+      Trail.undo_to(mark)
+      i += 1
 
   def head(self) -> Term:
     return self.args[0]
 
   def prefix_and_tail(self) -> Tuple[List[Term], Any]:
-    """ Get the initial list of objects and either the tail if it is a Var or [] if it is not a Var. """
-    if self.is_empty():
-      return ([], [])
-    else:
-      Tail_EoT = self.tail().unification_chain_end()
-      if isinstance(Tail_EoT, LinkedList):
-        (tail_prefix, Tail_Tail) = Tail_EoT.prefix_and_tail( )
-        return ([self.head()] + tail_prefix, Tail_Tail)
-      else:
-        return ([self.head()], Tail_EoT)
+    """
+    Get the initial list of objects and either the tail if it is a Var or [] if it is not a Var.
+    Walks the list iteratively: O(n) and no recursion.
+    """
+    if self._closed_prefix is not None:
+      return (list(self._closed_prefix), [])
+    prefix = []
+    A_List = self
+    while not A_List.is_empty( ):
+      prefix.append(A_List.head( ))
+      Tail_EoT = A_List.tail( ).unification_chain_end( )
+      if not isinstance(Tail_EoT, LinkedList):
+        return (prefix, Tail_EoT)
+      A_List = Tail_EoT
+    return (prefix, [])
 
   def tail(self) -> Union[LinkedList, Var]:
     return self.args[1]
@@ -116,6 +189,7 @@ emptyLinkedList = LinkedList([])
 
 
 @euc
+@trampolined
 def append(Xs: Union[LinkedList, Var], Ys: Union[LinkedList, Var], Zs: Union[LinkedList, Var]):
   """
     append([], Ys, Ys).
@@ -149,16 +223,17 @@ def append(Xs: Union[LinkedList, Var], Ys: Union[LinkedList, Var], Zs: Union[Lin
   Xs or Zs is empty, unify_pairs will fail.
 
   The actual code is quite short. It's very similar to the prolog code.
+  It runs on a Trampoline, so sub-goals are yielded rather than yield-from'ed. (See control_structures.Trampoline.)
   """
 
   # Corresponds to append([], Ys, Ys).
-  yield from unify_pairs([(Xs, emptyLinkedList), (Ys, Zs)])
+  yield unify_pairs([(Xs, emptyLinkedList), (Ys, Zs)])
 
   # Corresponds to append([X | Xs], Ys, [X | Zs]): - append(Xs, Ys, Zs).
   (XZ_Head, Xs_Tail, Zs_Tail) = n_Vars(3)
   for _ in unify_pairs([(Xs, LinkedList(XZ_Head, Xs_Tail)),
                         (Zs, LinkedList(XZ_Head, Zs_Tail))]):
-    yield from append(Xs_Tail, Ys, Zs_Tail)
+    yield append(Xs_Tail, Ys, Zs_Tail)
 
 
 if __name__ == '__main__':
@@ -1,7 +1,7 @@
 from __future__ import annotations
-from typing import List, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
-from logic_variables import euc, PyValue, n_Vars, unify, unify_pairs, unify_sequences, Var
+from logic_variables import ensure_is_logic_variable, euc, PyValue, n_Vars, Structure, Term, Trail, unify, unify_pairs, unify_sequences, Var
 from sequence_options.super_sequence import SuperSequence
 
 
@@ -10,10 +10,28 @@ class PySequence(SuperSequence):
   Python treats lists and tuples as essentially the same. This is the common core.
   The self.args are the list/tuple elements. Their length is fixed. (This disallows
   appending elements to a list or extending a list.)
+
+  The elements are stored as self._base[self._start:self._stop]. Ordinarily, _base is the tuple of elements,
+  and _start and _stop are its bounds. But tail( ) and (step 1) slices return views: PySequences that share
+  their parent's _base with different bounds. So they cost O(1): no copying of the elements and no
+  ensure_is_logic_variable. The self.args tuple of a view is built only if someone asks for it.
   """
+
+  __slots__ = ('_base', '_start', '_stop', '_args')
+
   def __init__(self, pyType, initialElements: Union[list, set, tuple]):
     super().__init__( (pyType, *initialElements) )
 
+  @property
+  def args(self) -> tuple:
+    if self._args is None:
+      self._args = self._base[self._start:self._stop]
+    return self._args
+
+  @args.setter
+  def args(self, args: tuple):
+    (self._base, self._start, self._stop, self._args) = (args, 0, len(args), args)
+
   def __add__(self, Other: Union[PySequence, Var]) -> PySequence:
     Other_EoT = Other.unification_chain_end()
     # If not, can't append.
@@ -26,10 +44,17 @@ class PySequence(SuperSequence):
       return Result_EoT
 
   def __getitem__(self, key: Union[int, slice]):
-    return self.args[key] if isinstance(key, int) else self.__class__(self.args[key])
+    length = self._stop - self._start
+    if isinstance(key, int):
+      if not -length <= key < length:
+        raise IndexError(f'{type(self).__name__} index out of range')
+      return self._base[self._start + (key if key >= 0 else key + length)]
+    (start, stop, step) = key.indices(length)
+    return self._view(self._start + start, self._start + max(start, stop)) if step == 1 else \
+           self.__class__(self.args[key])
 
   def __len__(self):
-    return len(self.args)
+    return self._stop - self._start
 
   def __str__(self):
     (left, right) = {list: ('[', ']'), set: ('{', '}'), tuple: ('(', ')')}[self.functor]
@@ -39,6 +64,10 @@ class PySequence(SuperSequence):
     result = f'{left}{values_string}{right}'
     return result
 
+  def closed_elements(self) -> tuple:
+    """ A PySequence is always closed. """
+    return self.args
+
   def get_py_value(self) -> tuple:
     return self.functor(arg.get_py_value() for arg in self.args)
 
@@ -50,43 +79,245 @@ class PySequence(SuperSequence):
     elif len_As > len_self:
       return  # Fail.
     else:
-      for i in range(len_self - len_As + 1):
+      for i in range(self._start, self._stop - len_As + 1):
         # Succeed for each segment of self that can be unified with As.
         # This is the same strategy used in the LinkedList version. Just much more straightforward.
-        for _ in unify_sequences(As, self.args[i:i+len_As]):
+        for _ in unify_sequences(As, self._base[i:i+len_As]):
           yield
 
   def head(self):
     return self[0]
 
+  def is_empty(self) -> bool:
+    return self._start == self._stop
+
   def tail(self) -> PySequence:
-    return self.__class__(self.args[1:])
+    return self._view(self._start + 1, self._stop)
+
+  def _view(self, start: int, stop: int, view_type: Optional[type] = None) -> PySequence:
+    """
+    A PySequence whose elements are self._base[start:stop]. See the class docstring.
+    It is of class view_type if given, otherwise of the same class as self.
+    """
+    view = object.__new__(view_type or type(self))
+    (view.functor, view._base, view._start, view._stop, view._args, view._ground) = \
+      (self.functor, self._base, start, stop, None, None)
+    Term.__init__(view)
+    return view
 
   def to_python_list(self) -> list:
     return [*self.args]
 
 
 class PyList(PySequence):
+
+  __slots__ = ( )
+
   def __init__(self, initialElements: list):
     super().__init__( list, initialElements )
 
 
 class PyTuple(PySequence):
+
+  __slots__ = ( )
+
   def __init__(self, initialElements: tuple):
     super( ).__init__( tuple, initialElements )
 
 
 class PySet(PySequence):
+  """
+  A set of Terms, stored so that looking up and discarding an instantiated PyValue take O(1).
+
+  self._elements is the tuple of all the elements the set started with, and self._present is a bitmask of those
+  still in it. self._positions maps the py_value of each element that is an instantiated PyValue to its position.
+  (A PyValue can't change once it has a value.) Any other element, or a duplicate value, is unindexed:
+  self._unindexed is the bitmask of their positions. They are compared one by one, as before.
+
+  discard( ) returns a new PySet that shares _elements, _positions, and _unindexed with this one. Only the
+  _present mask is new. So a search that discards a value from a set at each node copies no sets.
+  The args tuple (the elements still present, in their original order) is built only if someone asks for it.
+  """
+
+  __slots__ = ('_elements', '_positions', '_unindexed', '_present', '_count')
+
   def __init__(self, initialElements: Union[list, set, tuple]):
     """ Doesn't check to see whether initialElements is really a set. """
     super( ).__init__( set, tuple(initialElements) )
 
-  def discard(self, Other: PyValue) -> PySet:
-    Other_EoT = Other.unification_chain_end()
-    new_args = [arg for arg in self.args if arg != Other_EoT]
-    new_set = PySet(new_args)
+  @property
+  def args(self) -> tuple:
+    if self._args is None:
+      elements = self._elements
+      self._args = tuple(elements[i] for i in self._positions_in(self._present))
+      (self._base, self._start, self._stop) = (self._args, 0, len(self._args))
+    return self._args
+
+  @args.setter
+  def args(self, args: tuple):
+    (self._base, self._start, self._stop, self._args) = (args, 0, len(args), args)
+    (self._elements, self._positions, self._unindexed) = (args, {}, 0)
+    for (i, arg) in enumerate(args):
+      if isinstance(arg, PyValue) and arg.is_instantiated( ) and arg.get_py_value( ) not in self._positions:
+        self._positions[arg.get_py_value( )] = i
+      else:
+        self._unindexed |= 1 << i
+    (self._present, self._count) = ((1 << len(args)) - 1, len(args))
+
+  def __contains__(self, Other: Any) -> bool:
+    """ Is an element of this set == Other? """
+    return self._matches(ensure_is_logic_variable(Other).unification_chain_end( )) != 0
+
+  def __getitem__(self, key: Union[int, slice]):
+    self.args  # Build _base, on which PySequence.__getitem__ works.
+    return super( ).__getitem__(key)
+
+  def __len__(self):
+    return self._count
+
+  def discard(self, Other: Any) -> PySet:
+    """ This set without the elements that are == Other. This set itself if there are none. """
+    matches = self._matches(ensure_is_logic_variable(Other).unification_chain_end( ))
+    if not matches:
+      return self
+    new_set = object.__new__(PySet)
+    (new_set.functor, new_set._elements, new_set._positions, new_set._unindexed) = \
+      (self.functor, self._elements, self._positions, self._unindexed)
+    (new_set._present, new_set._count) = (self._present & ~matches, self._count - bin(matches).count('1'))
+    (new_set._base, new_set._start, new_set._stop, new_set._args, new_set._ground) = (None, 0, 0, None, None)
+    Term.__init__(new_set)
     return new_set
 
+  def has_contiguous_sublist(self, As: List):
+    self.args  # Build _base. (See __getitem__.)
+    yield from super( ).has_contiguous_sublist(As)
+
+  def is_empty(self) -> bool:
+    return self._count == 0
+
+  def member_candidates(self, E: Term) -> List[Term]:
+    """ If E is an instantiated PyValue, only the element == E (if any) and the unindexed elements. """
+    E_EoT = ensure_is_logic_variable(E).unification_chain_end( )
+    if not (isinstance(E_EoT, PyValue) and E_EoT.is_instantiated( )):
+      return self.args
+    position = self._positions.get(E_EoT.get_py_value( ))
+    candidates = (self._unindexed if position is None else self._unindexed | 1 << position) & self._present
+    return [self._elements[i] for i in self._positions_in(candidates)]
+
+  def tail(self) -> PySequence:
+    self.args  # Build _base. (See __getitem__.)
+    return super( ).tail( )
+
+  def _matches(self, Other_EoT: Term) -> int:
+    """ The mask of the positions of the elements present that are == Other_EoT. """
+    if isinstance(Other_EoT, PyValue) and Other_EoT.is_instantiated( ):
+      position = self._positions.get(Other_EoT.get_py_value( ))
+      (matches, to_compare) = (0 if position is None else 1 << position, self._unindexed & self._present)
+    else:
+      (matches, to_compare) = (0, self._present)
+    for i in self._positions_in(to_compare):
+      if self._elements[i] == Other_EoT:
+        matches |= 1 << i
+    return matches & self._present
+
+  @staticmethod
+  def _positions_in(mask: int) -> Iterator[int]:
+    """ The positions of the 1 bits in mask, in increasing order. """
+    while mask:
+      bit = mask & -mask
+      mask ^= bit
+      yield bit.bit_length( ) - 1
+
+  def _view(self, start: int, stop: int, view_type: Optional[type] = None) -> PySequence:
+    """ A slice of a PySet is a new PySet. """
+    return (view_type or PySet)(self._base[start:stop])
+
+
+class Positions:
+  """ A set of element positions, held as a bitmask so that it can be updated on the Trail. """
+
+  __slots__ = ('mask', )
+
+  def __init__(self, mask: int = 0):
+    self.mask = mask
+
+
+class IndexedPyList(PyList):
+  """
+  A PyList of Structures (typically StructureItems, e.g., zebra puzzle Houses) that indexes its elements
+  by argument value, so that member need not try to unify E with every element.
+
+  For each argument position p, self._index[p] is (buckets, unindexed):
+    buckets[value]: the Positions of the elements whose argument p is known to be ground with ground_key value;
+    unindexed:      the Positions of the remaining elements that have an argument p. (It may have become ground.)
+  self._others is the Positions of the remaining elements: those that are not themselves Structures. (A Var bound
+  to a Structure may be unbound by backtracking.) They are always candidates.
+
+  A ground argument stays ground until backtracking. So when member_candidates finds that an unindexed argument
+  has become ground, it moves its element into the right bucket. (Initially, only PyValue arguments are indexed.)
+  The move is recorded on the Trail (see Undo_Trail.cache), which undoes it no later than the binding that made
+  the argument ground. Thus the index is never wrong, merely incomplete, and an element is left out of the
+  candidates only if one of its arguments is ground and differs from E's.
+  """
+
+  __slots__ = ('_index', '_others')
+
+  def __init__(self, initialElements: list):
+    super( ).__init__( initialElements )
+    self._index: List[Tuple[Dict[object, Positions], Positions]] = []
+    others = 0
+    for (i, element) in enumerate(self.args):
+      # Don't look through a bound Var. Its binding, and hence its Structure, may be undone by backtracking.
+      if not isinstance(element, Structure):
+        others |= 1 << i
+        continue
+      for p in range(len(self._index), len(element.args)):
+        self._index.append( ({}, Positions( )) )
+      for (p, arg) in enumerate(element.args):
+        (buckets, unindexed) = self._index[p]
+        # Only a PyValue is sure to stay ground. A bound Var may be unbound by backtracking, which would
+        # leave the index wrong. So bound Vars are indexed later, on the Trail, by member_candidates.
+        if isinstance(arg, PyValue):
+          buckets.setdefault(arg.ground_key( ), Positions( )).mask |= 1 << i
+        else:
+          unindexed.mask |= 1 << i
+    self._others = Positions(others)
+
+  def _view(self, start: int, stop: int, view_type: Optional[type] = None) -> PySequence:
+    """ Views share the elements but not the index. They are plain PyLists. """
+    return super( )._view(start, stop, view_type or PyList)
+
+  def member_candidates(self, E: Term) -> List[Term]:
+    """ The elements that E might unify with, in order. See the class docstring. """
+    E_EoT = ensure_is_logic_variable(E).unification_chain_end( )
+    elements = self.args
+    if not isinstance(E_EoT, Structure):
+      return elements
+    candidates = (1 << len(elements)) - 1
+    for (p, arg) in enumerate(E_EoT.args[:len(self._index)]):
+      key = arg.ground_key( )
+      if key is None:
+        continue
+      (buckets, unindexed) = self._index[p]
+      # Index any candidates whose argument p has become ground since we last looked.
+      to_check = unindexed.mask & candidates
+      while to_check:
+        bit = to_check & -to_check
+        to_check ^= bit
+        element_key = elements[bit.bit_length( ) - 1].args[p].ground_key( )
+        if element_key is not None:
+          Trail.cache(unindexed, 'mask', unindexed.mask & ~bit)
+          bucket = buckets.setdefault(element_key, Positions( ))
+          Trail.cache(bucket, 'mask', bucket.mask | bit)
+      bucket = buckets.get(key)
+      candidates &= (bucket.mask if bucket else 0) | unindexed.mask | self._others.mask
+    result = []
+    while candidates:
+      bit = candidates & -candidates
+      candidates ^= bit
+      result.append(elements[bit.bit_length( ) - 1])
+    return result
+
 
 @euc
 def append(Xs: Union[PySequence, Var], Ys: Union[PySequence, Var], Zs: Union[PySequence, Var]):
@@ -97,37 +328,33 @@ def append(Xs: Union[PySequence, Var], Ys: Union[PySequence, Var], Zs: Union[PyS
     See discussion in linked_list version.
 
     This version assumes we are working with Python lists or tuples, i.e., no uninstantiated tails.
+    Since their lengths are known, there is no need to recurse. Instead, dispatch on which lengths are known.
   """
 
-  if isinstance(Zs, Var) and ( isinstance(Xs, Var) or isinstance(Ys, Var) ):
+  if isinstance(Zs, Var):
+    if isinstance(Xs, Var) or isinstance(Ys, Var):
       # Can't have Xs or Ys Var if Zs is Var.
       return
-
-  if isinstance(Zs, Var):
-    ListType = type(Xs)
-    # Make Zs a list of Var's of length len(Xs) + len(Ys)
-    # After this unification, Zs will still be a Var, but
-    # by the time we reach this point again, Zs will refer
-    # to its trail end, which is not a Var.
-    for _ in unify(Zs, ListType(n_Vars(len(Xs) + len(Ys)))):
-      yield from append(Xs, Ys, Zs)
+    if Xs.functor != Ys.functor:
+      # A list and a tuple (say) can't be appended. (Their elements would not unify with those of any Zs.)
+      return
+    # Zs is simply the concatenation of Xs and Ys.
+    yield from unify(Zs, type(Xs)([*Xs.args, *Ys.args]))
     return
 
   # We now know that: Zs is not a Var -- although it may be a sequence of Vars.
-  # Divide up its length among Xs and Ys
-  ListType = type(Zs)
+  # Divide up its length among Xs and Ys. Zs[:i] and Zs[i:] are views of Zs: no copying and no new Vars.
+  # (If Xs or Ys is a Sequence of a different type from Zs, unify will fail.)
   len_Zs = len(Zs)
-  for i in range(len_Zs + 1):
-    # If Xs or Ys are already instantiated to some fixed length Sequence, unify will fail when given the wrong length.
-    for _ in unify_pairs([ (Xs, ListType(n_Vars(i))),
-                           (Ys, ListType(n_Vars(len_Zs - i)))  ]):
-      # Although the lengths of Xs and Ys vary with i,
-      # Xs, Ys, and Zs are all of fixed lengths in which len(Xs) + len(Ys) = len(Zs).
-      # Concatenate Xs and Ys and then unify the concatenation with Zs.
-      XYs = [*Xs.unification_chain_end().args, *Ys.unification_chain_end().args]
-      yield from unify_sequences(XYs, Zs.args)
-      # for _ in unify_sequences(XYs, Zs.args):
-      #   yield
+  if isinstance(Xs, Var) and isinstance(Ys, Var):
+    # Any split will do.
+    splits = range(len_Zs + 1)
+  else:
+    # Only one split is possible.
+    i = len_Zs - len(Ys) if isinstance(Xs, Var) else len(Xs)
+    splits = [i] if 0 <= i <= len_Zs else []
+  for i in splits:
+    yield from unify_pairs([(Xs, Zs[:i]), (Ys, Zs[i:])])
 
 
 if __name__ == '__main__':
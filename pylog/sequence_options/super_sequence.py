@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import List, Union
+from itertools import count
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
-from control_structures import forany, forall
-from logic_variables import euc, Structure, unify, Term, Var
+from control_structures import forall, forany, trampolined
+from logic_variables import bind, ensure_is_logic_variable, euc, n_Vars, PyValue, Structure, Term, Trail, unify, Var
 
 
 class SuperSequence(Structure):
@@ -11,15 +12,28 @@ class SuperSequence(Structure):
   Declares a number of abstract methods.
   """
 
+  __slots__ = ( )
+
   def __getitem__(self, key: Union[int, slice]) -> Union[SuperSequence, Term]:
       pass
 
   def __len__(self):
     pass
 
+  def closed_elements(self) -> Optional[Sequence[Term]]:
+    """ If this sequence is closed, i.e., its length is fixed, its elements. Otherwise None. """
+    return None
+
   def has_contiguous_sublist(self, As):
     pass
 
+  def member_candidates(self, E: Term) -> Optional[Iterable[Term]]:
+    """
+    If this sequence is closed, the elements that E might unify with. Otherwise None.
+    All the elements unless a subclass knows better. (See sequences.IndexedPyList.)
+    """
+    return self.closed_elements( )
+
   def head(self) -> Term:
     pass
 
@@ -46,6 +60,118 @@ def is_contiguous_in(As: List, Zs: SuperSequence):
 def is_a_subsequence_of(As: List, Zs: SuperSequence):
   """
   As may be spread out in Zs but must be in the same order as in Zs.
+  Succeeds once for each embedding of As in Zs, i.e., each increasing tuple of positions in Zs,
+  in lexicographic order of the position tuples.
+
+  If Zs is closed, first compute (see subsequence_table) which positions can ever hold each of As.
+  Then walk the position tuples with an index per element of As: no recursion and no slicing.
+  Positions that can't lead to an embedding are never tried.
+  """
+  elements = Zs.closed_elements( )
+  if elements is None:
+    yield from is_a_subsequence_of_open(As, Zs)
+    return
+  As = As.to_python_list( ) if isinstance(As, SuperSequence) else As
+  (len_As, len_Zs) = (len(As), len(elements))
+  (fits, can_finish) = subsequence_table(As, elements)
+  if not can_finish[0][0]:
+    return
+  if len_As == 0:
+    yield
+    return
+  # next_z[a] is the next position to try for As[a]; marks[a] is the Trail mark taken before binding As[a].
+  (next_z, marks) = ([0] * len_As, [0] * len_As)
+  a = 0
+  while a >= 0:
+    # Find the next position z for As[a] that fits and that leaves room for As[a+1:] after it.
+    z = next_z[a]
+    while z < len_Zs and not (fits[a][z] and can_finish[a + 1][z + 1]):
+      z += 1
+    if z == len_Zs:
+      # No more positions for As[a]. Back up to As[a-1] and undo its binding.
+      a -= 1
+      if a >= 0:
+        Trail.undo_to(marks[a])
+      continue
+    next_z[a] = z + 1
+    marks[a] = Trail.mark( )
+    if not bind(As[a], elements[z]):
+      Trail.undo_to(marks[a])
+    elif a == len_As - 1:
+      yield
+      Trail.undo_to(marks[a])
+    else:
+      a += 1
+      next_z[a] = z + 1
+
+
+def is_a_subsequence(As: List, Zs: SuperSequence) -> bool:
+  """
+  Is As a subsequence of Zs? A yes/no answer: nothing is bound.
+
+  If As and Zs are both ground, compare their elements' ground_keys greedily, which is linear in len(Zs).
+  Otherwise, look for a first embedding with is_a_subsequence_of and undo it.
+  """
+  As = As.to_python_list( ) if isinstance(As, SuperSequence) else As
+  As = [ensure_is_logic_variable(A) for A in As]
+  Zs_EoT = Zs.unification_chain_end( )
+  elements = Zs_EoT.closed_elements( )
+  As_keys = [A.ground_key( ) for A in As]
+  Zs_keys = [] if elements is None else [Z.ground_key( ) for Z in elements]
+  if elements is None or None in As_keys or None in Zs_keys:
+    mark = Trail.mark( )
+    for _ in is_a_subsequence_of(As, Zs_EoT):
+      Trail.undo_to(mark)
+      return True
+    return False
+  a = 0
+  for Z_key in Zs_keys:
+    if a == len(As_keys):
+      break
+    if Z_key == As_keys[a]:
+      a += 1
+  return a == len(As_keys)
+
+
+def subsequence_table(As: Sequence, elements: Sequence[Term]) -> Tuple[List[List[bool]], List[List[bool]]]:
+  """
+  The dynamic programming tables that let is_a_subsequence_of skip hopeless positions.
+
+  fits[a][z]: As[a] unifies with elements[z] on its own. If both are ground, this is a comparison of their
+  ground_keys. Otherwise it is a trial bind, which is then undone.
+  can_finish[a][z]: As[a:] fits, in order, into elements[z:], element by element. (It is a necessary condition
+  for an embedding, not a sufficient one: As may share Vars.) can_finish[len(As)][z] is True for all z.
+  Both are computed in O(len(As) * len(elements)).
+  """
+  (len_As, len_Zs) = (len(As), len(elements))
+  Zs_keys = [Z.ground_key( ) for Z in elements]
+  mark = Trail.mark( )
+  fits = []
+  for A in As:
+    A = ensure_is_logic_variable(A)
+    A_key = A.ground_key( )
+    row = []
+    for (Z, Z_key) in zip(elements, Zs_keys):
+      if A_key is not None and Z_key is not None:
+        row.append(A_key == Z_key)
+      else:
+        row.append(bind(A, Z))
+        Trail.undo_to(mark)
+    fits.append(row)
+  can_finish = [[False] * (len_Zs + 1) for _ in range(len_As)] + [[True] * (len_Zs + 1)]
+  for a in range(len_As - 1, -1, -1):
+    (row, next_row, fits_row) = (can_finish[a], can_finish[a + 1], fits[a])
+    for z in range(len_Zs - 1, -1, -1):
+      row[z] = fits_row[z] and next_row[z + 1] or row[z + 1]
+  return (fits, can_finish)
+
+
+@euc
+@trampolined
+def is_a_subsequence_of_open(As: List, Zs: SuperSequence):
+  """
+  is_a_subsequence_of for a Zs that is not closed, i.e., an open LinkedList. (This is the original version.)
+  Runs on a Trampoline. (See control_structures.Trampoline.)
   """
   if not As:
     # If no more As to match, we're done. Succeed.
@@ -56,20 +182,23 @@ def is_a_subsequence_of(As: List, Zs: SuperSequence):
     return
 
   else:
-    for _ in forany([
-                     # Match As[0] and Zs[0]; go on to is_a_subsequence_of(As[1:], Zs[1:])
-                     lambda: forall([lambda: unify(As[0], Zs[0]),
-                                     lambda: is_a_subsequence_of(As[1:], Zs[1:])]),
-                     # Whether or not we matched As[0] and Zs[0] above, try is_a_subsequence_of(As, Zs[1:])
-                     lambda: is_a_subsequence_of(As, Zs[1:])
-                     ]):
-      yield
+    # This is forany([forall([unify(As[0], Zs[0]), is_a_subsequence_of(As[1:], Zs[1:])]),
+    #                 is_a_subsequence_of(As, Zs[1:])])
+    # written out directly so that no goal lists are built at each step.
+    Zs_tail = Zs[1:]
+    # Match As[0] and Zs[0]; go on to is_a_subsequence_of(As[1:], Zs[1:])
+    for _ in unify(As[0], Zs[0]):
+      yield is_a_subsequence_of_open(As[1:], Zs_tail)
+    # Whether or not we matched As[0] and Zs[0] above, try is_a_subsequence_of(As, Zs[1:])
+    yield is_a_subsequence_of_open(As, Zs_tail)
 
 
 @euc
+@trampolined
 def member(E: Term, A_List: Union[List, SuperSequence, Var]):
   """
   Is E in A_List?
+  Runs on a Trampoline: sub-goals are yielded rather than yield-from'ed. (See control_structures.Trampoline.)
   """
   # if isinstance(A_List, list):
   #   yield from member_python_list(E, A_List)
@@ -78,12 +207,38 @@ def member(E: Term, A_List: Union[List, SuperSequence, Var]):
   if A_List.is_empty():
     return
 
+  # If A_List is closed, there is no need to walk it with head( ) and tail( ). Loop over its elements,
+  # (or those that might match E), binding E to each one in turn and undoing the binding before moving on.
+  elements = A_List.member_candidates(E)
+  if elements is not None:
+    mark = Trail.mark( )
+    for element in elements:
+      if bind(E, element):
+        yield
+      Trail.undo_to(mark)
+    return
+
+  # A_List is open. Walk it with head( ) and tail( ). Its tails are open too, so member_open does not look
+  # for member_candidates again at each step. (Doing so would walk the rest of the list each time.)
+  yield member_open(E, A_List)
+
+
+@euc
+@trampolined
+def member_open(E: Term, A_List: SuperSequence):
+  """
+  member for an A_List that is not closed, i.e., an open LinkedList. (This is the original version.)
+  Runs on a Trampoline. (See control_structures.Trampoline.)
+  """
+  if A_List.is_empty():
+    return
+
   # The following is an implicit 'or'. Either unify E with A_List.head() or call member(E, A_List.tail()).
 
   # The first case is easy.
   # for _ in unify(E, A_List.head( )):
   #   yield
-  yield from unify(E, A_List.head( ))
+  yield unify(E, A_List.head( ))
 
   # The second case--member(E, A_List.tail())--is trickier.
   # Since A_List may be an open-ended LinkedList, A_List.tail() may be a Var.
@@ -98,27 +253,100 @@ def member(E: Term, A_List: Union[List, SuperSequence, Var]):
   A_List_New_Tail = type(A_List)((Var( ), Var( ))) if isinstance(A_List_Tail, Var) else A_List_Tail
   # If A_List_New_Tail is A_List_Tail, this unify does nothing.
   for _ in unify(A_List_New_Tail, A_List_Tail):
-    yield from member(E, A_List_New_Tail)
+    yield member_open(E, A_List_New_Tail)
 
 
 @euc
+@trampolined
 def members(Es: List, A_List: SuperSequence):
-  """ Do all elements of es appear in A_List (in any order). """
-  # No more to look up. We're done.
-  if not Es:
-    yield
-  else:
-    for _ in member(Es[0], A_List):
-      yield from members(Es[1:], A_List)
+  """ Do all elements of es appear in A_List (in any order). Runs on a Trampoline. """
+  yield forall([(member, (E, A_List)) for E in Es])
+
+
+@euc
+def at_position(E: Term, Index: Union[int, Var], Es: SuperSequence):
+  """
+  Is E at position Index in Es? Index may be an int (negative counts from the end, if Es is closed)
+  or a Var, in which case succeed for each position at which E may be, binding Index to it.
+  A negative Index fails if Es is open: its end isn't known.
+  """
+  if isinstance(Index, PyValue):
+    Index = Index.get_py_value( )
+  elements = Es.closed_elements( )
+  if elements is None:
+    # An open LinkedList. Make it long enough to have an element at Index. (We can't import LinkedList.)
+    if isinstance(Index, int) and Index < 0:
+      return
+    for i in ([Index] if isinstance(Index, int) else count( )):
+      for _ in unify(Index, i):
+        yield from unify(Es, type(Es).cons_cells([*n_Vars(i), E], 0, Var( )))
+    return
+  if isinstance(Index, int):
+    if -len(elements) <= Index < len(elements):
+      yield from unify(E, elements[Index])
+    return
+  mark = Trail.mark( )
+  for (i, element) in enumerate(elements):
+    if bind(Index, i) and bind(E, element):
+      yield
+    Trail.undo_to(mark)
+
+
+def left_of(E1: Term, E2: Term, Es: SuperSequence):
+  """ Is E1 immediately to the left of E2 in Es? """
+  yield from placed_apart(E1, E2, Es, 1, True)
 
 
 def next_to(E1: Term, E2: Term, Es: SuperSequence):
   """ Are E1 and E2 are next to each other in Es. """
-  for _ in forany([
-                   lambda: is_contiguous_in([E1, E2], Es),
-                   lambda: is_contiguous_in([E2, E1], Es),
-                   ]):
-    yield
+  yield from placed_apart(E1, E2, Es, 1, None)
+
+
+def right_of(E1: Term, E2: Term, Es: SuperSequence):
+  """ Is E1 immediately to the right of E2 in Es? """
+  yield from placed_apart(E1, E2, Es, 1, False)
+
+
+def within_distance(E1: Term, E2: Term, k: int, Es: SuperSequence):
+  """ Are E1 and E2 at most k positions apart (but not at the same position) in Es? """
+  yield from placed_apart(E1, E2, Es, k, None)
+
+
+@euc
+def placed_apart(E1: Term, E2: Term, Es: SuperSequence, k: int, ordered: Optional[bool]):
+  """
+  The core of next_to and its relatives. Succeeds for each pair of positions i < j in Es with j - i <= k
+  such that E1 is at i and E2 at j (unless ordered is False) or E2 is at i and E1 at j (unless ordered is True).
+
+  If Es is closed, this is a single pass over its elements that tries both orientations at each pair of
+  positions. If Es is an open LinkedList, fall back to is_contiguous_in, which can extend it.
+  """
+  elements = Es.closed_elements( )
+  if elements is None:
+    segments = [[E1, *n_Vars(d - 1), E2] for d in range(1, k + 1)] if ordered is not False else []
+    if ordered is not True:
+      segments += [[E2, *n_Vars(d - 1), E1] for d in range(1, k + 1)]
+    yield from forany([(is_contiguous_in, (segment, Es)) for segment in segments])
+    return
+  # First find where E1 and E2 can each go on their own. Only pairs of such positions need be tried together.
+  mark = Trail.mark( )
+  (fits_1, fits_2) = ([], [])
+  for element in elements:
+    fits_1.append(bind(E1, element))
+    Trail.undo_to(mark)
+    fits_2.append(bind(E2, element))
+    Trail.undo_to(mark)
+  last = len(elements) - 1
+  for i in range(last):
+    for j in range(i + 1, min(i + k, last) + 1):
+      if ordered is not False and fits_1[i] and fits_2[j]:
+        if bind(E1, elements[i]) and bind(E2, elements[j]):
+          yield
+        Trail.undo_to(mark)
+      if ordered is not True and fits_2[i] and fits_1[j]:
+        if bind(E2, elements[i]) and bind(E1, elements[j]):
+          yield
+        Trail.undo_to(mark)
 
 
 def reversed(A_List: SuperSequence) -> SuperSequence:
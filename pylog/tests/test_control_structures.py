@@ -0,0 +1,30 @@
+from control_structures import forall, forany, Trampoline
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+
+def successes(goal) -> int:
+  return sum(1 for _ in goal)
+
+
+def test_trampoline_runs_yielded_iterators( ):
+  def gen( ):
+    yield iter([])
+    yield iter([None, None])
+    yield
+
+  assert successes(Trampoline(gen( ))) == 3
+
+
+def test_forall_with_iterator_and_list_goals( ):
+  assert successes(forall([lambda: iter([])])) == 0
+  assert successes(forall([lambda: [None, None]])) == 2
+  assert successes(forall([lambda: [None, None], lambda: iter([None, None, None])])) == 6
+  assert successes(forall([lambda: [None], lambda: []])) == 0
+
+
+def test_forany_with_iterator_and_list_goals( ):
+  assert successes(forany([lambda: iter([])])) == 0
+  assert successes(forany([lambda: [], lambda: [None, None], (iter, ([None],))])) == 3
@@ -0,0 +1,41 @@
+from logic_variables import PyValue, Trail, unify, Var
+from sequence_options.linked_list import LinkedList
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+n = 20_000
+
+
+def test_long_lists( ):
+  (A, B) = (LinkedList(range(n)), LinkedList.from_iterable(range(n)))
+  C = LinkedList.cons_cells([*range(n - 1), -1])
+  assert A.is_instantiated( ) and B.is_instantiated( )
+  assert A == B and hash(A) == hash(B)
+  assert A != C and not A == C
+  assert len(A) == n and A[n - 1] == PyValue(n - 1)
+  assert A.get_py_value( ) == list(range(n))
+
+
+def test_long_open_lists( ):
+  (Tail, Other_Tail) = (Var( ), Var( ))
+  (A, B) = (LinkedList.from_iterable(range(n), Tail), LinkedList.from_iterable(range(n), Other_Tail))
+  assert not A.is_instantiated( )
+  assert A != B
+  solutions = 0
+  for _ in unify(A, B):
+    assert A == B
+    for _ in unify(Tail, LinkedList([ ])):
+      assert A.is_instantiated( ) and A == LinkedList(range(n))
+      solutions += 1
+    assert not A.is_instantiated( )
+  assert solutions == 1 and A != B
+
+
+def test_no_trail_entries_at_top_level( ):
+  mark = Trail.mark( )
+  for _ in range(1000):
+    A = LinkedList(range(10))
+    assert A.is_instantiated( ) and len(A) == 10 and A == LinkedList(range(10))
+  assert Trail.mark( ) == mark
@@ -0,0 +1,28 @@
+from logic_variables import Trail, unify, unify_pairs, unify_sequences, Var
+from sequence_options.linked_list import LinkedList
+from sequence_options.sequences import PyList
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+
+def test_abandoned_unify_undoes_its_bindings( ):
+  mark = Trail.mark( )
+  (X, Y) = (Var( ), Var( ))
+  # Nothing else refers to the generator, so it is closed as soon as the loop is left.
+  for goal in [lambda: unify(X, 1), lambda: unify_pairs([(X, 1), (Y, 2)]), lambda: unify_sequences([X, Y], [1, 2])]:
+    for _ in goal( ):
+      assert X.get_py_value( ) == 1
+      break
+    assert Trail.mark( ) == mark and not X.is_instantiated( )
+
+
+def test_no_trail_entries_left_by_add( ):
+  mark = Trail.mark( )
+  assert (PyList([1, 2]) + PyList([3])).get_py_value( ) == [1, 2, 3]
+  assert Trail.mark( ) == mark
+  for _ in range(3):
+    A = LinkedList(range(50))
+    assert len(A) == 50 and A.is_instantiated( )
+  assert Trail.mark( ) == mark
@@ -0,0 +1,26 @@
+from logic_variables import bind, Structure, Trail, Var
+from sequence_options.sequences import append, IndexedPyList, PyList, PyTuple
+from sequence_options.super_sequence import member
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+
+def test_indexed_member_after_backtracking( ):
+  V = Var( )
+  mark = Trail.mark( )
+  assert bind(V, Structure( ('h', 'x', 'p') ))
+  # Index the list while V is bound. The index must not depend on that binding.
+  Hs = IndexedPyList([V, Structure( ('h', 'y', 'q') )])
+  Trail.undo_to(mark)
+  # V is unbound again, so it can become h(_, 'r').
+  E = Structure( ('h', Var( ), 'r') )
+  assert [V.unification_chain_end( ) for _ in member(E, Hs)] == [E]
+
+
+def test_append_fails_on_different_sequence_types( ):
+  Zs = Var( )
+  assert [Zs.get_py_value( ) for _ in append(PyList([1]), PyList([2]), Zs)] == [[1, 2]]
+  assert [Zs.get_py_value( ) for _ in append(PyList([1]), PyTuple((2,)), Zs)] == []
+  assert PyList([1]) + PyTuple((2,)) is None
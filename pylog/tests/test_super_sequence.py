@@ -0,0 +1,37 @@
+from logic_variables import PyValue, Var
+from sequence_options.linked_list import LinkedList
+from sequence_options.super_sequence import at_position, member
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+
+def values_at(Index, Es) -> list:
+  E = Var( )
+  return [E.get_py_value( ) for _ in at_position(E, Index, Es)]
+
+
+def test_at_position_negative_index( ):
+  closed = LinkedList(['a', 'b'])
+  assert values_at(-1, closed) == ['b']
+  assert values_at(-2, closed) == ['a']
+  assert values_at(-3, closed) == []
+  open_list = LinkedList( (PyValue('a'), Var( )) )
+  assert values_at(-1, open_list) == []
+  assert values_at(-2, open_list) == []
+  assert values_at(0, open_list) == ['a']
+  assert values_at(1, open_list) == [None]
+
+
+def test_member_of_open_list( ):
+  E = Var( )
+  open_list = LinkedList( (PyValue('a'), LinkedList( (PyValue('b'), Var( )) )) )
+  found = []
+  for _ in member(E, open_list):
+    found.append(E.get_py_value( ))
+    if len(found) == 4:
+      break
+  # After the known elements, member extends the open tail with a new (unbound) element at each step.
+  assert found == ['a', 'b', None, None]
+  assert len(open_list.prefix_and_tail( )[0]) == 2
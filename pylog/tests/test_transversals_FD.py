@@ -0,0 +1,52 @@
+from itertools import product
+from random import seed
+
+from examples.transversals.transversals_FD import gen_sets, Model
+
+"""
+Run from the pylog directory, e.g., python -m pytest tests
+"""
+
+# (nbr_sets, sets_size_high) of small instances, each generated from seeds 0 - 4.
+small_families = [(5, None), (6, None), (7, 3), (8, 3)]
+
+
+def seeded_sets(nbr_sets, sets_size_high, instance: int):
+  seed(instance)
+  return gen_sets(nbr_sets, sets_size_high)
+
+
+def solve(sets, propagate: bool, smallest_first: bool, matching: bool):
+  """ The set of solutions, each a tuple of values in the order of sets, and the number of search nodes. """
+  model = Model.from_sets(sets, propagate, smallest_first, matching)
+  # Model_Var ids are assigned in the order of sets.
+  vars = sorted(model.vars, key=lambda v: v.id)
+  solutions = {tuple(v.value( ) for v in vars) for _ in model.solutions( )}
+  return (solutions, model.nodes)
+
+
+def brute_force(sets):
+  return {values for values in product(*sets) if len(set(values)) == len(values)}
+
+
+def test_matching_finds_the_same_solutions( ):
+  for (nbr_sets, sets_size_high) in small_families:
+    for instance in range(5):
+      sets = seeded_sets(nbr_sets, sets_size_high, instance)
+      expected = brute_force(sets)
+      for smallest_first in [False, True]:
+        (propagate_solutions, propagate_nodes) = solve(sets, True, smallest_first, False)
+        (matching_solutions, matching_nodes) = solve(sets, True, smallest_first, True)
+        assert propagate_solutions == expected
+        assert matching_solutions == expected
+        if not smallest_first:
+          # The Vars are chosen in the same order, and the matching filter leaves each domain no larger.
+          # So the matching search tree is part of the propagate-only one.
+          assert matching_nodes <= propagate_nodes
+
+
+def test_matching_finds_infeasible_instances_before_the_search( ):
+  for instance in range(3):
+    sets = seeded_sets(20, 4, instance)
+    for smallest_first in [False, True]:
+      assert solve(sets, True, smallest_first, True) == (set( ), 0)